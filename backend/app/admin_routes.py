@@ -3,9 +3,12 @@ Admin Chat Route - Context-aware RAG chatbot
 """
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
-from chain import get_or_create_chain, chat_with_memory
+from typing import List, Literal, Optional, Dict, Any
+from app_logging import get_logger
+
+logger = get_logger("admin")
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
@@ -18,8 +21,12 @@ class ChatMessage(BaseModel):
 class AdminChatRequest(BaseModel):
     message: str
     history: Optional[List[ChatMessage]] = []
+    session_id: Optional[str] = None
     application_context: Optional[Dict[str, Any]] = None
     analysis_context: Optional[Dict[str, Any]] = None
+    # Streaming options (only used by /api/admin/chat-stream)
+    stream_format: Literal["text", "sse"] = "sse"
+    include_sources: bool = False
 
 class AdminChatResponse(BaseModel):
     answer: str
@@ -126,78 +133,31 @@ def build_analysis_context(analysis: Dict[str, Any]) -> str:
     Total Funding: {fmt_currency(ai.get('funding_recommendation', 0) or 0)}
     """
 
-SYSTEM_INSTRUCTIONS = """
-    Instructions: You are assisting a BSWD administrator. Use the BSWD manual knowledge and the application/analysis context to provide clear, policy-backed answers.
-
-    CRITICAL TERMINOLOGY:
-    - "Federal/Provincial Need" = FUNDING REQUESTED
-    - "Requested Items" = EQUIPMENT/SERVICE COSTS
-    - Total Funding = Provincial + Federal
-    - Total Equipment = Sum of requested items
-    - Ratio = Total Funding / Total Equipment
-
-    CONFIDENCE SCORING SYSTEM:
-
-    The scoring is deterministic and correct. When explaining:
-    1. Walk through each step (Eligibility -> Funding -> Ratio)
-    2. Cite specific penalties with dollar amounts
-    3. Never suggest the logic might be wrong
-    4. Explain manual overrides are available
-
-    Funding Limits (by OSAP type):
-    - Full-time OSAP: BSWD $2K (provincial) + CSG $20K (federal) = $22K max
-    - Part-time OSAP: BSWD $2K (provincial) only, NO federal CSG
-    - No OSAP: BSWD $2K (provincial) only, NO federal CSG
-
-    Step 1 - Eligibility (-33 each):
-    - No verified permanent/persistent disability
-    - Has OSAP restrictions
-
-    Step 2 - Funding Limits (-30 each, can stack):
-    - Provincial funding > $2,000
-    - Federal funding > $20,000 (full-time only)
-    - Federal funding > $0 (part-time or no OSAP)
-
-    Step 3 - Funding/Equipment Ratio (ratio = funding / equipment):
-    - Ratio >= 4.0: -60 (severe over-funding)
-    - Ratio >= 2.0: -30 (major over-funding)
-    - Ratio > 1.2: -15 (funding exceeds equipment 21%+)
-    - Ratio 1.0-1.2: -2 per 10% (funding 0-20% over equipment)
-    - Ratio <= 0.5: -15 (major funding gap)
-    - Ratio 0.5-1.0: -5 (minor funding gap)
-
-    Thresholds: 90+=APPROVED | 75-89=MANUAL REVIEW | 0-74=REJECTED
-
-    Examples:
-    - Equipment $6,900, Funding $4,459 -> Ratio 0.646 -> Gap $2,441 -> -5 -> Score 95 -> APPROVED
-    - Equipment $6,900, Funding $10,000 -> Ratio 1.449 -> Excess $3,100 -> -15 -> Score 85 -> MANUAL REVIEW
-    """
+def build_turn_inputs(request: AdminChatRequest) -> Dict[str, str]:
+    """Prompt inputs for one admin turn (sent with this turn only, never stored in memory)"""
+    context_parts = []
+    if request.application_context:
+        context_parts.append(build_application_context(request.application_context))
+    if request.analysis_context:
+        context_parts.append(build_analysis_context(request.analysis_context))
+    return {"application_context": ''.join(context_parts) or "No application selected."}
 
-# ROUTE
+# ROUTES
 
 @router.post("/chat", response_model=AdminChatResponse)
 async def admin_chat(request: AdminChatRequest):
     """Admin chatbot with BSWD manual access and application context"""
     try:
-        chain, memory = get_or_create_chain()
-        
-        # Build context
-        context_parts = []
-        if request.application_context:
-            context_parts.append(build_application_context(request.application_context))
-        if request.analysis_context:
-            context_parts.append(build_analysis_context(request.analysis_context))
-        
-        # Combine context with question
-        enhanced_message = (
-            ''.join(context_parts) +
-            f"\n\nADMIN QUESTION: {request.message}\n\n" +
-            SYSTEM_INSTRUCTIONS +
-            "\n\nNow answer the admin's question with confidence in the scoring system."
-        )
+        from chain import aget_admin_chain, achat_with_memory
+
+        chain, memory_store = await aget_admin_chain()
+        memory = memory_store.for_request(request.session_id, request.history)
         
         # Get response
-        response = chat_with_memory(chain, memory, enhanced_message)
+        response = await achat_with_memory(
+            chain, memory, request.message,
+            ephemeral_inputs=build_turn_inputs(request)
+        )
         
         # Format source documents
         source_docs = [
@@ -211,5 +171,28 @@ async def admin_chat(request: AdminChatRequest):
         return AdminChatResponse(answer=response["answer"], source_documents=source_docs)
         
     except Exception as e:
-        print(f"Admin chat error: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Chat failed: {str(e)}")
\ No newline at end of file
+        logger.exception("Admin chat error")
+        raise HTTPException(status_code=500, detail=f"Chat failed: {str(e)}")
+
+@router.post("/chat-stream")
+async def admin_chat_stream(request: AdminChatRequest):
+    """Admin chatbot stream: server-sent 'token' events (then 'done'), or raw text with stream_format=text"""
+    try:
+        from chain import aget_admin_chain, achat_with_memory_stream
+
+        chain, memory_store = await aget_admin_chain()
+        memory = memory_store.for_request(request.session_id, request.history)
+        sse = request.stream_format == "sse"
+        return StreamingResponse(
+            achat_with_memory_stream(
+                chain, memory, request.message,
+                sse=sse,
+                include_sources=request.include_sources,
+                ephemeral_inputs=build_turn_inputs(request)
+            ),
+            media_type="text/event-stream" if sse else "text/plain; charset=utf-8"
+        )
+
+    except Exception as e:
+        logger.exception("Admin chat stream error")
+        raise HTTPException(status_code=500, detail=f"Chat failed: {str(e)}")
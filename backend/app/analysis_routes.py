@@ -2,27 +2,33 @@
 Enhanced Analysis Routes with Financial Assessment
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Literal, Optional, Dict, Any
 from enum import Enum
 from datetime import datetime, timezone
+import asyncio
 import json
 import os
-from chain import get_or_create_chain, chat_with_memory
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
+from app_logging import get_logger
+from background_jobs import BackgroundJobQueue, background_jobs_supported
+from cache_backends import canonical_hash, create_cache_backend
+from equipment_matcher import EquipmentMatcher, load_funding_limits
+from model_router import model_for
 from deterministic_checks import (
     run_deterministic_checks,
     calculate_confidence_score,
     DeterministicCheckResult
 )
 
+logger = get_logger("analysis")
+
 router = APIRouter(prefix="/api/analysis", tags=["analysis"])
 
 # CONSTANTS
 
-FUNDING_LIMITS = {
+DEFAULT_FUNDING_LIMITS = {
     "technology": {"bswd": 2000, "csg": 8000, "items": ["laptop", "computer", "tablet", "ipad"]},
     "software": {"bswd": 500, "csg": 2000, "items": ["software", "app", "subscription"]},
     "furniture": {"bswd": 1500, "csg": 0, "items": ["desk", "chair", "ergonomic"]},
@@ -31,8 +37,27 @@ FUNDING_LIMITS = {
     "note_taking": {"bswd": 2000, "csg": 8000, "items": ["note-taker", "scribe"]},
 }
 
+# Loaded once at startup; set EQUIPMENT_CATEGORIES_PATH to override the table
+FUNDING_LIMITS = load_funding_limits(DEFAULT_FUNDING_LIMITS)
+EQUIPMENT_MATCHER = EquipmentMatcher(FUNDING_LIMITS)
+
 ANNUAL_CAP = 22000
 
+# Max applications analyzed at once by /batch (each one is an LLM round-trip)
+BATCH_CONCURRENCY = int(os.getenv("ANALYSIS_BATCH_CONCURRENCY", "8"))
+
+# llm: LLM-written reasoning (deterministic text if the call fails)
+# deterministic: always generate_fallback_reasoning, no LLM call at all
+# background: return the deterministic text now, write the LLM reasoning in a background job
+ANALYSIS_REASONING_MODE = os.getenv("ANALYSIS_REASONING_MODE", "llm").lower()
+
+# Background LLM enrichment of analysis reasoning (ANALYSIS_REASONING_MODE=background)
+reasoning_jobs = BackgroundJobQueue(
+    "reasoning",
+    concurrency=int(os.getenv("ANALYSIS_ENRICHMENT_CONCURRENCY", "4")),
+    ttl_seconds=float(os.getenv("ANALYSIS_ENRICHMENT_TTL_SECONDS", "3600"))
+)
+
 # MODELS
 
 class ApplicationStatus(str, Enum):
@@ -62,6 +87,10 @@ class AIAnalysisResult(BaseModel):
     risk_factors: List[str]
     requires_human_review: bool
     reasoning: str
+    # "llm" or "deterministic" (generate_fallback_reasoning)
+    reasoning_source: str = "llm"
+    # Set while LLM reasoning is being written in the background; poll /reasoning/{id}
+    enrichment_id: Optional[str] = None
 
 class ApplicationAnalysis(BaseModel):
     application_id: str
@@ -100,6 +129,70 @@ class ScoreRequest(BaseModel):
     federal_need: float
     requested_items: List[Dict[str, Any]]
 
+class BulkScoreRequest(BaseModel):
+    applications: List[ScoreRequest]
+
+# PROMPTS
+
+# Plain (role, template) pairs; the ChatPromptTemplate is only built when the
+# LLM is first used, so the deterministic routes never import LangChain.
+ANALYSIS_PROMPT_MESSAGES = [
+    ("system", """You are a BSWD application analyst. Provide concise, factual analysis.
+
+        INSTRUCTIONS:
+        1. Write EXACTLY 2-3 sentences
+        2. Use precise dollar amounts
+        3. Be direct and factual
+
+        TERMINOLOGY:
+        - Ratio = Funding / Equipment
+        - Ratio < 1.0: funding gap (equipment costs more)
+        - Ratio > 1.0: funding excess (over-funded)
+
+        Format as JSON: {{"risk_factors": ["..."], "reasoning": "..."}}"""),
+            
+    ("human", """Score: {confidence_score}/100 → {status}
+
+        Student: {first_name} {last_name}
+        Equipment: ${equipment_cost:.2f}
+        Funding: ${total_funding:.2f} (Provincial: ${provincial_need:.2f}, Federal: ${federal_need:.2f})
+        Ratio: {ratio:.3f}
+        Gap/Excess: ${gap_amount:.2f}
+        Failed Checks: {failed_checks}
+
+        Provide JSON with "risk_factors" and "reasoning".""")
+]
+
+ANALYSIS_MODEL = model_for("analysis")
+
+_analysis_pipeline = None
+
+def get_analysis_pipeline():
+    """Prompt | LLM pipeline for analysis reasoning, compiled once and reused"""
+    global _analysis_pipeline
+    if _analysis_pipeline is None:
+        from langchain_core.prompts import ChatPromptTemplate
+        from llm_clients import get_chat_model
+
+        from metrics_callbacks import stage_timing_handler
+
+        prompt = ChatPromptTemplate.from_messages(ANALYSIS_PROMPT_MESSAGES)
+        llm = get_chat_model(ANALYSIS_MODEL, temperature=0.3).with_config(run_name="analysis")
+        _analysis_pipeline = (prompt | llm).with_config(callbacks=[stage_timing_handler])
+    return _analysis_pipeline
+
+# Cache of LLM reasoning keyed on the prompt inputs (ANALYSIS_CACHE_* env vars)
+analysis_cache = create_cache_backend("ANALYSIS", default_ttl_seconds=7 * 24 * 3600)
+_analysis_prompt_hash = canonical_hash(ANALYSIS_PROMPT_MESSAGES)
+
+def analysis_cache_key(prompt_inputs: Dict[str, Any]) -> str:
+    """Content hash of everything that determines the LLM's analysis output"""
+    return canonical_hash({
+        "model": ANALYSIS_MODEL,
+        "prompt": _analysis_prompt_hash,
+        "inputs": prompt_inputs
+    })
+
 # ANALYSIS FUNCTIONS
 
 def analyze_financial_need(app_data: ApplicationData) -> FinancialAnalysis:
@@ -115,22 +208,16 @@ def analyze_financial_need(app_data: ApplicationData) -> FinancialAnalysis:
         exceeds_cap_by=max(0, total_requested - ANNUAL_CAP)
     )
 
-def analyze_equipment_costs(app_data: ApplicationData) -> List[EquipmentIssue]:
-    """Validate equipment against policy limits"""
+def check_equipment_items(items: List[Dict[str, Any]], categories: Optional[List[Optional[str]]] = None) -> List[EquipmentIssue]:
+    """Validate requested items against policy limits (categories may be precomputed by the matcher)"""
     issues = []
+    if categories is None:
+        categories = EQUIPMENT_MATCHER.match_many(item.get("item") for item in items)
     
-    for item in app_data.requested_items:
-        item_name = item.get("item").lower()
-        item_cost = item.get("cost")
+    for item, matched_category in zip(items, categories):
+        item_cost = item.get("cost", 0)
         funding_source = item.get("funding_source", "bswd").lower()
         
-        # Find matching category
-        matched_category = next(
-            (cat for cat, rules in FUNDING_LIMITS.items() 
-             if any(keyword in item_name for keyword in rules["items"])),
-            None
-        )
-        
         if not matched_category:
             continue
         
@@ -156,6 +243,15 @@ def analyze_equipment_costs(app_data: ApplicationData) -> List[EquipmentIssue]:
     
     return issues
 
+def check_equipment_batch(item_lists: List[List[Dict[str, Any]]]) -> List[List[EquipmentIssue]]:
+    """Validate the requested items of many applications, preserving order"""
+    categories = EQUIPMENT_MATCHER.match_applications(item_lists)
+    return [check_equipment_items(items, cats) for items, cats in zip(item_lists, categories)]
+
+def analyze_equipment_costs(app_data: ApplicationData) -> List[EquipmentIssue]:
+    """Validate equipment against policy limits"""
+    return check_equipment_items(app_data.requested_items)
+
 def generate_fallback_reasoning(
     confidence_score: float,
     recommended_status: ApplicationStatus,
@@ -165,48 +261,87 @@ def generate_fallback_reasoning(
     ratio: float
 ) -> tuple[str, List[str]]:
     
+    # Plain value ("APPROVED"); str-mixin enums format as "ApplicationStatus.APPROVED" on Python 3.11+
+    status = getattr(recommended_status, "value", recommended_status)
+    
     # Determine primary issue
     if app_data.provincial_need > 2000:
-        reasoning = f"Score of {confidence_score}/100 results in {recommended_status}. Provincial funding request of ${app_data.provincial_need:,.2f} exceeds $2,000 BSWD limit (-30 penalty)."
+        reasoning = f"Score of {confidence_score}/100 results in {status}. Provincial funding request of ${app_data.provincial_need:,.2f} exceeds $2,000 BSWD limit (-30 penalty)."
         risk_factors = [f"Provincial funding ${app_data.provincial_need:,.2f} exceeds $2,000 limit"]
         
     elif app_data.federal_need > 0 and getattr(app_data, 'osap_application', '').lower() in ['part-time', 'none']:
-        reasoning = f"Score of {confidence_score}/100 results in {recommended_status}. Federal funding request of ${app_data.federal_need:,.2f} present but student not eligible for CSG."
+        reasoning = f"Score of {confidence_score}/100 results in {status}. Federal funding request of ${app_data.federal_need:,.2f} present but student not eligible for CSG."
         risk_factors = [f"Federal funding ${app_data.federal_need:,.2f} when not eligible for CSG"]
         
     elif ratio > 1.2:
         excess = total_funding - equipment_cost
-        reasoning = f"Score of {confidence_score}/100 results in {recommended_status}. Requesting ${total_funding:,.2f} in funding for ${equipment_cost:,.2f} in equipment, ${excess:,.2f} excess."
+        reasoning = f"Score of {confidence_score}/100 results in {status}. Requesting ${total_funding:,.2f} in funding for ${equipment_cost:,.2f} in equipment, ${excess:,.2f} excess."
         risk_factors = [f"Funding exceeds equipment by ${excess:,.2f}"]
         
     elif ratio > 1.0:
         excess = total_funding - equipment_cost
-        reasoning = f"Score of {confidence_score}/100 results in {recommended_status}. Funding request of ${total_funding:,.2f} slightly exceeds equipment costs of ${equipment_cost:,.2f}."
+        reasoning = f"Score of {confidence_score}/100 results in {status}. Funding request of ${total_funding:,.2f} slightly exceeds equipment costs of ${equipment_cost:,.2f}."
         risk_factors = [f"Funding exceeds equipment by ${excess:,.2f}"]
         
     elif ratio <= 0.5:
         gap = equipment_cost - total_funding
-        reasoning = f"Score of {confidence_score}/100 results in {recommended_status}. Requesting ${total_funding:,.2f} in funding for ${equipment_cost:,.2f} in equipment, leaving ${gap:,.2f} gap."
+        reasoning = f"Score of {confidence_score}/100 results in {status}. Requesting ${total_funding:,.2f} in funding for ${equipment_cost:,.2f} in equipment, leaving ${gap:,.2f} gap."
         risk_factors = [f"Equipment costs ${gap:,.2f} more than funding (major gap)"]
         
     elif ratio < 1.0:
         gap = equipment_cost - total_funding
-        reasoning = f"Score of {confidence_score}/100 results in {recommended_status}. Requesting ${total_funding:,.2f} in funding for ${equipment_cost:,.2f} in equipment, leaving ${gap:,.2f} gap."
+        reasoning = f"Score of {confidence_score}/100 results in {status}. Requesting ${total_funding:,.2f} in funding for ${equipment_cost:,.2f} in equipment, leaving ${gap:,.2f} gap."
         risk_factors = [f"Equipment costs ${gap:,.2f} more than funding requested"]
         
     else:
-        reasoning = f"Score of {confidence_score}/100 results in {recommended_status}. Funding request of ${total_funding:,.2f} matches equipment costs."
+        reasoning = f"Score of {confidence_score}/100 results in {status}. Funding request of ${total_funding:,.2f} matches equipment costs."
         risk_factors = []
     
     return reasoning, risk_factors
 
+async def cached_ai_reasoning(prompt_inputs: Dict[str, Any]) -> Optional[tuple[str, List[str]]]:
+    """LLM (reasoning, risk_factors) from the analysis cache, without calling the LLM"""
+    try:
+        ai_data = await analysis_cache.aget(analysis_cache_key(prompt_inputs))
+    except Exception as e:
+        logger.warning("Analysis cache lookup failed: %s", e)
+        return None
+    if ai_data is None:
+        return None
+    return ai_data.get("reasoning", ""), ai_data.get("risk_factors", [])
+
+async def generate_ai_reasoning(prompt_inputs: Dict[str, Any]) -> Optional[tuple[str, List[str]]]:
+    """LLM (reasoning, risk_factors) for an analysis, or None if the call or its JSON fails"""
+    # The prompt only sees prompt_inputs, so equal inputs can reuse a cached answer
+    try:
+        cache_key = analysis_cache_key(prompt_inputs)
+        ai_data = await analysis_cache.aget(cache_key)
+        if ai_data is None:
+            response = await get_analysis_pipeline().ainvoke(prompt_inputs)
+            ai_data = json.loads(response.content.replace("```json", "").replace("```", "").strip())
+            await analysis_cache.aset(cache_key, ai_data)
+        
+        return ai_data.get("reasoning", ""), ai_data.get("risk_factors", [])
+        
+    except Exception as e:
+        logger.warning("AI reasoning failed, using fallback reasoning: %s", e)
+        return None
+
+async def enrich_reasoning(prompt_inputs: Dict[str, Any]) -> Dict[str, Any]:
+    """Background job: LLM reasoning for an analysis that was returned with deterministic text"""
+    ai_reasoning = await generate_ai_reasoning(prompt_inputs)
+    if ai_reasoning is None:
+        raise RuntimeError("AI reasoning unavailable")
+    return {"reasoning": ai_reasoning[0], "risk_factors": ai_reasoning[1]}
+
 async def run_ai_analysis(
     app_data: ApplicationData,
     deterministic_result: DeterministicCheckResult,
     financial_analysis: FinancialAnalysis,
-    equipment_issues: List[EquipmentIssue]
+    equipment_issues: List[EquipmentIssue],
+    reasoning_mode: Optional[str] = None
 ) -> AIAnalysisResult:
-    """Run AI analysis with confidence scoring"""
+    """Run AI analysis with confidence scoring (reasoning_mode defaults to ANALYSIS_REASONING_MODE)"""
     
     total_funding = app_data.provincial_need + app_data.federal_need
     equipment_cost = financial_analysis.total_requested
@@ -237,62 +372,41 @@ async def run_ai_analysis(
     ratio = (total_funding / equipment_cost) if equipment_cost > 0 else 0
     gap_amount = abs(total_funding - equipment_cost)
     
-    # Try LLM reasoning
-    llm = ChatOpenAI(
-        model="gpt-4-turbo-preview",
-        temperature=0.3,
-        openai_api_key=os.getenv("OPENAI_API_KEY")
-    )
+    prompt_inputs = {
+        "confidence_score": confidence_score,
+        "status": recommended_status.value,
+        "first_name": app_data.first_name,
+        "last_name": app_data.last_name,
+        "osap_application": getattr(app_data, 'osap_application', 'unknown'),
+        "provincial_need": app_data.provincial_need,
+        "federal_need": app_data.federal_need,
+        "total_funding": total_funding,
+        "equipment_cost": equipment_cost,
+        "ratio": ratio,
+        "gap_amount": gap_amount,
+        "failed_checks": ', '.join(deterministic_result.failed_checks) or 'None'
+    }
     
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", """You are a BSWD application analyst. Provide concise, factual analysis.
-
-        INSTRUCTIONS:
-        1. Write EXACTLY 2-3 sentences
-        2. Use precise dollar amounts
-        3. Be direct and factual
-
-        TERMINOLOGY:
-        - Ratio = Funding / Equipment
-        - Ratio < 1.0: funding gap (equipment costs more)
-        - Ratio > 1.0: funding excess (over-funded)
-
-        Format as JSON: {{"risk_factors": ["..."], "reasoning": "..."}}"""),
-                
-                ("human", """Score: {confidence_score}/100 → {status}
-
-        Student: {first_name} {last_name}
-        Equipment: ${equipment_cost:.2f}
-        Funding: ${total_funding:.2f} (Provincial: ${provincial_need:.2f}, Federal: ${federal_need:.2f})
-        Ratio: {ratio:.3f}
-        Gap/Excess: ${gap_amount:.2f}
-        Failed Checks: {failed_checks}
-
-        Provide JSON with "risk_factors" and "reasoning".""")
-        ])
+    # LLM reasoning unless disabled or deferred; the deterministic text covers the rest
+    reasoning_mode = reasoning_mode or ANALYSIS_REASONING_MODE
+    if ANALYSIS_REASONING_MODE == "deterministic":
+        # A no-LLM deployment stays that way whatever the client asks for
+        reasoning_mode = "deterministic"
+    if reasoning_mode == "background" and not background_jobs_supported():
+        # Nobody could poll the job here; write the reasoning inline instead
+        reasoning_mode = "llm"
+    ai_reasoning = None
+    enrichment_id = None
+    if reasoning_mode == "llm":
+        ai_reasoning = await generate_ai_reasoning(prompt_inputs)
+    elif reasoning_mode == "background":
+        ai_reasoning = await cached_ai_reasoning(prompt_inputs)
+        if ai_reasoning is None:
+            enrichment_id = reasoning_jobs.submit(lambda: enrich_reasoning(prompt_inputs))
     
-    try:
-        response = await (prompt | llm).ainvoke({
-            "confidence_score": confidence_score,
-            "status": recommended_status.value,
-            "first_name": app_data.first_name,
-            "last_name": app_data.last_name,
-            "osap_application": getattr(app_data, 'osap_application', 'unknown'),
-            "provincial_need": app_data.provincial_need,
-            "federal_need": app_data.federal_need,
-            "total_funding": total_funding,
-            "equipment_cost": equipment_cost,
-            "ratio": ratio,
-            "gap_amount": gap_amount,
-            "failed_checks": ', '.join(deterministic_result.failed_checks) or 'None'
-        })
-        
-        ai_data = json.loads(response.content.replace("```json", "").replace("```", "").strip())
-        risk_factors = ai_data.get("risk_factors", [])
-        reasoning = ai_data.get("reasoning", "")
-        
-    except Exception as e:
-        print(f"AI reasoning failed: {e}")
+    if ai_reasoning is not None:
+        reasoning, risk_factors = ai_reasoning
+    else:
         reasoning, risk_factors = generate_fallback_reasoning(
             confidence_score, recommended_status, app_data, 
             total_funding, equipment_cost, ratio
@@ -312,56 +426,169 @@ async def run_ai_analysis(
         funding_recommendation=funding_recommendation,
         risk_factors=risk_factors,
         requires_human_review=requires_human_review,
-        reasoning=reasoning
+        reasoning=reasoning,
+        reasoning_source="llm" if ai_reasoning is not None else "deterministic",
+        enrichment_id=enrichment_id
     )
 
 # ROUTES
 
+async def build_application_analysis(
+    app_data: ApplicationData,
+    equipment_categories: Optional[List[Optional[str]]] = None,
+    reasoning_mode: Optional[str] = None
+) -> ApplicationAnalysis:
+    """Full analysis of one application (item categories may be precomputed by a batch)"""
+    deterministic_result = run_deterministic_checks (
+        app_data.disability_type,
+        app_data.study_type,
+        app_data.has_osap_restrictions
+        )
+    financial_analysis = analyze_financial_need(app_data)
+    equipment_issues = check_equipment_items(app_data.requested_items, equipment_categories)
+    ai_result = await run_ai_analysis(
+        app_data, deterministic_result, financial_analysis, equipment_issues, reasoning_mode
+    )
+    
+    return ApplicationAnalysis(
+        application_id=app_data.application_id,
+        deterministic_checks=deterministic_result,
+        financial_analysis=financial_analysis,
+        equipment_review=equipment_issues,
+        ai_analysis=ai_result,
+        overall_status=ai_result.recommended_status,
+        analysis_timestamp=datetime.now(timezone.utc).isoformat()
+    )
+
 @router.post("/application", response_model=ApplicationAnalysis)
-async def analyze_application(app_data: ApplicationData):
+async def analyze_application(
+    app_data: ApplicationData,
+    reasoning: Optional[Literal["llm", "deterministic", "background"]] = None
+):
+    """
+    Analyze one application.
+
+    `reasoning` overrides ANALYSIS_REASONING_MODE for this call, except
+    that a deterministic server never calls the LLM. With
+    "background" the response is deterministic and immediate; if
+    `ai_analysis.enrichment_id` is set, the LLM reasoning can be fetched
+    from /reasoning/{enrichment_id} once it is written.
+    """
     try:
-        deterministic_result = run_deterministic_checks (
-            app_data.disability_type,
-            app_data.study_type,
-            app_data.has_osap_restrictions
-            )
-        financial_analysis = analyze_financial_need(app_data)
-        equipment_issues = analyze_equipment_costs(app_data)
-        ai_result = await run_ai_analysis(
-            app_data, deterministic_result, financial_analysis, equipment_issues
-        )
-        
-        return ApplicationAnalysis(
-            application_id=app_data.application_id,
-            deterministic_checks=deterministic_result,
-            financial_analysis=financial_analysis,
-            equipment_review=equipment_issues,
-            ai_analysis=ai_result,
-            overall_status=ai_result.recommended_status,
-            analysis_timestamp=datetime.now(timezone.utc).isoformat()
-        )
+        return await build_application_analysis(app_data, reasoning_mode=reasoning)
     except Exception as e:
+        logger.exception("Analysis failed")
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
+@router.get("/reasoning/{enrichment_id}")
+async def get_reasoning(enrichment_id: str, wait: float = Query(0, ge=0, le=30)):
+    """
+    Poll for background LLM reasoning.
+
+    With `wait` > 0 the request long-polls: it returns as soon as the
+    reasoning is ready, or after `wait` seconds with status "pending".
+    A "failed" status means the deterministic reasoning stands.
+    """
+    job = await reasoning_jobs.wait(enrichment_id, wait)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired enrichment id")
+    
+    result = job["result"] or {}
+    return {
+        "enrichment_id": enrichment_id,
+        "status": job["status"],
+        "reasoning": result.get("reasoning"),
+        "risk_factors": result.get("risk_factors"),
+        "reasoning_source": "llm" if job["status"] == "complete" else "deterministic"
+    }
+
+async def run_batch_analyses(applications: List[ApplicationData], concurrency: int):
+    """Analyze applications concurrently, yielding (index, analysis, error) as each finishes"""
+    semaphore = asyncio.Semaphore(concurrency)
+    # Match every requested item in the batch in one pass up front
+    equipment_categories = EQUIPMENT_MATCHER.match_applications(app.requested_items for app in applications)
+
+    async def analyze_one(index: int, app_data: ApplicationData):
+        async with semaphore:
+            try:
+                return index, await build_application_analysis(app_data, equipment_categories[index]), None
+            except Exception as e:
+                return index, None, f"Analysis failed: {str(e)}"
+
+    tasks = [asyncio.create_task(analyze_one(i, app)) for i, app in enumerate(applications)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Stop outstanding work if the consumer goes away (e.g. client disconnect)
+        for task in tasks:
+            task.cancel()
+
+def summarize_batch(analyses: List[ApplicationAnalysis], errors: List[Dict[str, Any]], total: int) -> Dict[str, Any]:
+    """Status counts and rates for a batch run"""
+    status_counts = {
+        status: sum(1 for a in analyses if a.overall_status == status)
+        for status in ApplicationStatus
+    }
+    
+    return {
+        "total_applications": total,
+        "succeeded": len(analyses),
+        "failed": len(errors),
+        "approved": status_counts[ApplicationStatus.APPROVED],
+        "rejected": status_counts[ApplicationStatus.REJECTED],
+        "needs_manual_review": status_counts[ApplicationStatus.NEEDS_MANUAL_REVIEW],
+        "approval_rate": status_counts[ApplicationStatus.APPROVED] / total if total > 0 else 0,
+        "manual_review_rate": status_counts[ApplicationStatus.NEEDS_MANUAL_REVIEW] / total if total > 0 else 0,
+    }
+
 @router.post("/batch")
-async def analyze_batch(request: Dict[str, List[ApplicationData]]):
+async def analyze_batch(
+    request: Dict[str, List[ApplicationData]],
+    concurrency: int = Query(BATCH_CONCURRENCY, ge=1, le=64),
+    stream: bool = False
+):
+    """
+    Analyze many applications with bounded parallelism.
+
+    A failing application is reported in `errors` instead of failing the batch.
+    With `stream=true` results are sent as NDJSON lines as they finish,
+    followed by a final summary line.
+    """
+    applications = request.get("applications", [])
+    total = len(applications)
+
+    if stream:
+        async def ndjson_results():
+            analyses, errors = [], []
+            async for index, analysis, error in run_batch_analyses(applications, concurrency):
+                if error is None:
+                    analyses.append(analysis)
+                    line = {"type": "result", "index": index, "analysis": analysis.model_dump(mode="json")}
+                else:
+                    errors.append({"index": index, "application_id": applications[index].application_id, "error": error})
+                    line = {"type": "error", **errors[-1]}
+                yield json.dumps(line) + "\n"
+            yield json.dumps({"type": "summary", **summarize_batch(analyses, errors, total)}) + "\n"
+
+        return StreamingResponse(ndjson_results(), media_type="application/x-ndjson")
+
     try:
-        analyses = [await analyze_application(app) for app in request.get("applications", [])]
+        results: List[Optional[ApplicationAnalysis]] = [None] * total
+        errors = []
+        async for index, analysis, error in run_batch_analyses(applications, concurrency):
+            if error is None:
+                results[index] = analysis
+            else:
+                errors.append({"index": index, "application_id": applications[index].application_id, "error": error})
         
-        total = len(analyses)
-        status_counts = {
-            status: sum(1 for a in analyses if a.overall_status == status)
-            for status in ApplicationStatus
-        }
+        analyses = [a for a in results if a is not None]
+        errors.sort(key=lambda e: e["index"])
         
         return {
-            "total_applications": total,
-            "approved": status_counts[ApplicationStatus.APPROVED],
-            "rejected": status_counts[ApplicationStatus.REJECTED],
-            "needs_manual_review": status_counts[ApplicationStatus.NEEDS_MANUAL_REVIEW],
-            "approval_rate": status_counts[ApplicationStatus.APPROVED] / total if total > 0 else 0,
-            "manual_review_rate": status_counts[ApplicationStatus.NEEDS_MANUAL_REVIEW] / total if total > 0 else 0,
-            "analyses": analyses
+            **summarize_batch(analyses, errors, total),
+            "analyses": analyses,
+            "errors": errors
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Batch analysis failed: {str(e)}")
@@ -378,8 +605,14 @@ async def chat_about_application(request: Dict[str, Any]):
         Requested Items: {len(app_data.get('requested_items', []))} items
         """
         
-        chain, memory = get_or_create_chain()
-        response = chat_with_memory(chain, memory, f"{context}\n\nQuestion: {request.get('message')}")
+        from chain import aget_admin_chain, achat_with_memory
+
+        chain, memory_store = await aget_admin_chain()
+        memory = memory_store.for_request(request.get("session_id"), request.get("history"))
+        response = await achat_with_memory(
+            chain, memory, request.get("message"),
+            ephemeral_inputs={"application_context": context}
+        )
         
         return {
             "answer": response["answer"],
@@ -408,6 +641,33 @@ async def calculate_score(request: ScoreRequest):
             equipment_cost
         )
         
-        return {"confidence_score": score}
+        return {
+            "confidence_score": score,
+            "equipment_issues": check_equipment_items(request.requested_items)
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Score calculation failed: {str(e)}")
+
+@router.get("/cache/stats")
+async def analysis_cache_stats():
+    """Hit/miss counters for the analysis reasoning cache"""
+    return await analysis_cache.astats()
+
+@router.delete("/cache")
+async def clear_analysis_cache():
+    """Drop all cached analysis reasoning"""
+    await analysis_cache.aclear()
+    return {"status": "success", "message": "Analysis cache cleared"}
+
+@router.post("/score/bulk")
+async def calculate_scores_bulk(request: BulkScoreRequest):
+    """Calculate confidence scores for many applications in one vectorized pass"""
+    try:
+        from bulk_scoring import score_requests
+
+        return {
+            "confidence_scores": score_requests(request.applications),
+            "equipment_issues": check_equipment_batch([app.requested_items for app in request.applications])
+        }
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Score calculation failed: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Bulk score calculation failed: {str(e)}")
@@ -0,0 +1,187 @@
+"""
+App Logging
+Structured, queue-backed logging with request ids, sampling and request timing
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()  # json | text
+# Hand records to a background thread so request paths never block on stdout.
+# Off by default on Lambda: the process is frozen as soon as the handler returns
+# (and atexit never runs), so queued records would be delayed or lost.
+LOG_ASYNC = os.getenv("LOG_ASYNC", "false" if os.getenv("AWS_LAMBDA_FUNCTION_NAME") else "true").lower() == "true"
+# Access-log sampling for high-volume routes, e.g. "/api/analysis/score=0.01,/api/chat=0.2"
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")
+# Log every request slower than this regardless of sampling
+LOG_SLOW_REQUEST_MS = float(os.getenv("LOG_SLOW_REQUEST_MS", "2000"))
+
+# Id of the request being served ("-" outside requests)
+request_id: ContextVar[str] = ContextVar("request_id", default="-")
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """Parse "path=rate,path=rate" into {path: rate}"""
+    rates = {}
+    for part in spec.split(","):
+        if "=" in part:
+            path, rate = part.rsplit("=", 1)
+            rates[path.strip()] = min(max(float(rate), 0.0), 1.0)
+    return rates
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamp each record with the current request id"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; fields passed as extra={"fields": {...}} are merged in"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class StructuredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that keeps the message and the traceback separate for the JSON formatter"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def configure_logging() -> None:
+    """
+    Set up the "bswd" logger tree once per process.
+
+    Records are stamped with the request id and, with LOG_ASYNC, put on an
+    in-memory queue; a listener thread formats and writes them to stdout.
+    Without it (the default on Lambda) records are written synchronously.
+    """
+    global _listener
+
+    logger = logging.getLogger("bswd")
+    if logger.handlers:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if LOG_FORMAT == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"))
+
+    if LOG_ASYNC:
+        log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+        handler: logging.Handler = StructuredQueueHandler(log_queue)
+        _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+    else:
+        handler = stream_handler
+
+    handler.addFilter(RequestContextFilter())
+    logger.addHandler(handler)
+    logger.setLevel(LOG_LEVEL)
+    logger.propagate = False
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger under the "bswd" tree (configured on first use)"""
+    configure_logging()
+    return logging.getLogger(f"bswd.{name}")
+
+
+access_logger = get_logger("access")
+
+
+class RequestLoggingMiddleware:
+    """
+    ASGI middleware that assigns a request id and logs method, path, status and duration.
+
+    The id comes from an incoming X-Request-ID header or is generated, and
+    is echoed back in the response. Successful fast requests on routes
+    listed in LOG_SAMPLE_RATES are logged at that rate; errors (5xx) and
+    requests slower than LOG_SLOW_REQUEST_MS are always logged.
+    """
+
+    def __init__(self, app, sample_rates: Optional[Dict[str, float]] = None):
+        self.app = app
+        self.sample_rates = parse_sample_rates(LOG_SAMPLE_RATES) if sample_rates is None else sample_rates
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope.get("headers") or [])
+        rid = headers.get(b"x-request-id", b"").decode("latin-1")[:64] or uuid.uuid4().hex
+        token = request_id.set(rid)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_request_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-request-id", rid.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            self._log(scope, status, duration_ms)
+            request_id.reset(token)
+
+    def _log(self, scope, status: int, duration_ms: float) -> None:
+        path = scope["path"]
+        always = status >= 500 or duration_ms >= LOG_SLOW_REQUEST_MS
+        rate = self.sample_rates.get(path, 1.0)
+        if not always and rate < 1.0 and random.random() >= rate:
+            return
+
+        level = logging.ERROR if status >= 500 else logging.WARNING if duration_ms >= LOG_SLOW_REQUEST_MS else logging.INFO
+        if not access_logger.isEnabledFor(level):
+            return
+        access_logger.log(level, "request", extra={"fields": {
+            "method": scope.get("method"),
+            "path": path,
+            "status": status,
+            "duration_ms": round(duration_ms, 2),
+            "sample_rate": rate,
+        }})
@@ -0,0 +1,148 @@
+"""
+Background Jobs
+In-process asyncio job queue with bounded concurrency and pollable, expiring results
+"""
+
+import asyncio
+import contextvars
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app_logging import get_logger
+
+logger = get_logger("jobs")
+
+# auto: on for a single long-running process, off on Lambda or with several workers
+# on / off: force it (e.g. "off" behind a load balancer over several hosts)
+BACKGROUND_JOBS = os.getenv("BACKGROUND_JOBS", "auto").lower()
+
+
+def background_jobs_supported() -> bool:
+    """
+    Whether jobs queued here can be polled by later requests.
+
+    Jobs live in this process's memory, so a poll has to reach the same
+    process after the response has been sent. That fails on Lambda (the
+    environment is frozen between invocations and requests land on any
+    instance) and with several uvicorn workers.
+    """
+    if BACKGROUND_JOBS in ("on", "off"):
+        return BACKGROUND_JOBS == "on"
+    if os.getenv("AWS_LAMBDA_FUNCTION_NAME"):
+        return False
+    return int(os.getenv("WEB_CONCURRENCY", "1") or "1") <= 1
+
+
+class BackgroundJobQueue:
+    """
+    Runs coroutine jobs on `concurrency` worker tasks after the request returns.
+
+    Jobs are submitted from the event loop and identified by an id the
+    client can poll. Finished results are kept for `ttl_seconds`, and at
+    most `max_jobs` are kept in total (oldest dropped first). Workers are
+    started lazily on the running loop, and restarted if the loop changes.
+    State is per process, so polls must reach the worker that took the job.
+
+    Each job runs in a copy of the context it was submitted from, so its
+    logs and metrics carry the submitting request's id and route.
+    """
+
+    def __init__(self, name: str, concurrency: int = 4, max_jobs: int = 1000, ttl_seconds: float = 3600):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_jobs = max_jobs
+        self.ttl_seconds = ttl_seconds
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._workers: list = []
+
+    def submit(self, job: Callable[[], Awaitable[Any]]) -> str:
+        """
+        Queue a job (must be called from the event loop).
+
+        Args:
+            job: Zero-argument coroutine function; its return value is the result
+
+        Returns:
+            str: Job id for get()/wait()
+        """
+        self._ensure_workers()
+        self._evict(time.monotonic())
+
+        job_id = uuid.uuid4().hex
+        self._jobs[job_id] = {
+            "status": "pending",
+            "result": None,
+            "error": None,
+            "finished_at": None,
+            "done": asyncio.Event(),
+        }
+        while len(self._jobs) > self.max_jobs:
+            self._jobs.popitem(last=False)
+
+        self._queue.put_nowait((job_id, job, contextvars.copy_context()))
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """{"status", "result", "error"} for a job, or None if unknown or expired"""
+        self._evict(time.monotonic())
+        record = self._jobs.get(job_id)
+        if record is None:
+            return None
+        return {"status": record["status"], "result": record["result"], "error": record["error"]}
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """Like get(), but waits up to `timeout` seconds for a pending job to finish"""
+        record = self._jobs.get(job_id)
+        if record is not None and record["status"] == "pending" and timeout > 0:
+            try:
+                await asyncio.wait_for(record["done"].wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.get(job_id)
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def _ensure_workers(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._queue is not None:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        # A fresh context, so the workers don't keep the first submitter's request id/route
+        self._workers = [
+            loop.create_task(self._worker(), context=contextvars.Context())
+            for _ in range(self.concurrency)
+        ]
+
+    async def _worker(self) -> None:
+        queue = self._queue
+        while True:
+            job_id, job, context = await queue.get()
+            record = self._jobs.get(job_id)
+            try:
+                if record is not None:
+                    record["result"] = await asyncio.get_running_loop().create_task(job(), context=context)
+                    record["status"] = "complete"
+            except Exception as e:
+                context.run(logger.warning, f"{self.name} job failed: {e}")
+                record["status"] = "failed"
+                record["error"] = str(e)
+            finally:
+                if record is not None:
+                    record["finished_at"] = time.monotonic()
+                    record["done"].set()
+                queue.task_done()
+
+    def _evict(self, now: float) -> None:
+        expired = [
+            job_id for job_id, record in self._jobs.items()
+            if record["finished_at"] is not None and now - record["finished_at"] >= self.ttl_seconds
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
@@ -0,0 +1,97 @@
+"""
+Bulk Scoring Module
+Columnar (NumPy) version of the confidence scoring rules in deterministic_checks
+"""
+
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+VERIFIED_DISABILITY_TYPES = ["permanent", "persistent-prolonged"]
+
+
+def calculate_confidence_scores(
+    disability_types: Sequence[str],
+    study_types: Sequence[str],
+    has_osap_restrictions: Sequence[bool],
+    osap_applications: Sequence[str],
+    provincial_needs: Sequence[float],
+    federal_needs: Sequence[float],
+    equipment_costs: Sequence[float]
+) -> np.ndarray:
+    """
+    Calculate confidence scores (0-100) for many applications at once.
+
+    Applies the same penalties, in the same order and with the same float64
+    arithmetic, as run_deterministic_checks + calculate_confidence_score, so
+    every element equals the scalar result.
+    """
+    provincial = np.asarray(provincial_needs, dtype=np.float64)
+    federal = np.asarray(federal_needs, dtype=np.float64)
+    equipment = np.asarray(equipment_costs, dtype=np.float64)
+    total_funding = provincial + federal
+
+    has_disability = np.isin(np.asarray(disability_types, dtype=object), VERIFIED_DISABILITY_TYPES)
+    is_full_time = np.asarray(study_types, dtype=object) == "full-time"
+    restricted = np.asarray(has_osap_restrictions, dtype=bool)
+    eligible_for_csg = np.array([osap.lower() == "full-time" for osap in osap_applications], dtype=bool)
+
+    score = np.full(len(provincial), 100.0)
+
+    # Step 1: Eligibility (-33 each)
+    score -= np.where(has_disability, 0, 33)
+    score -= np.where(is_full_time, 0, 33)
+    score -= np.where(restricted, 33, 0)
+
+    # Step 2: Funding limits (-30 each)
+    score -= np.where(provincial > 2000, 30, 0)
+    federal_violation = (federal > 0) & (~eligible_for_csg | (federal > 20000))
+    score -= np.where(federal_violation, 30, 0)
+
+    # Step 3: Funding/Equipment ratio
+    has_equipment = equipment > 0
+    ratio = np.divide(total_funding, equipment, out=np.zeros_like(total_funding), where=has_equipment)
+
+    ratio_penalty = np.select(
+        [
+            ratio >= 4.0,
+            ratio >= 2.0,
+            ratio > 1.2,
+            ratio >= 1.0,
+            ratio <= 0.5,
+            ratio < 1.0,
+        ],
+        [
+            60,
+            30,
+            15,
+            np.trunc((ratio - 1.0) * 100 / 10) * 2,
+            15,
+            5,
+        ],
+        default=0
+    )
+    score -= np.where(has_equipment, ratio_penalty, 60)
+
+    return np.maximum(0, score)
+
+
+def score_requests(requests: List[Any]) -> List[float]:
+    """Score a list of ScoreRequest models, preserving order"""
+    if not requests:
+        return []
+
+    return calculate_confidence_scores(
+        [r.disability_type for r in requests],
+        [r.study_type for r in requests],
+        [r.has_osap_restrictions for r in requests],
+        [r.osap_application for r in requests],
+        [r.provincial_need for r in requests],
+        [r.federal_need for r in requests],
+        [equipment_cost(r.requested_items) for r in requests]
+    ).tolist()
+
+
+def equipment_cost(requested_items: List[Dict[str, Any]]) -> float:
+    """Total cost of requested items"""
+    return sum(item.get("cost", 0) for item in requested_items)
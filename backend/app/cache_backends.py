@@ -0,0 +1,306 @@
+"""
+Cache Backends
+Small key/value caches with TTL, size-bounded LRU eviction and hit/miss counters
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import anyio
+
+
+def canonical_hash(payload: Any) -> str:
+    """
+    Stable SHA-256 of a JSON-serializable payload.
+
+    Keys are sorted and whitespace is fixed, so equal inputs always
+    produce the same digest regardless of dict ordering.
+    """
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class CacheBackend(ABC):
+    """Base class: subclasses implement _get/_set/_clear/__len__"""
+    name = "base"
+
+    def __init__(self, ttl_seconds: Optional[float] = None, max_entries: int = 1000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # get() may run in worker threads (see the async methods)
+        self._counter_lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self._get(key)
+        with self._counter_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self._set(key, value)
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """get() for async callers; backends doing blocking I/O run it off the event loop"""
+        return self.get(key)
+
+    async def aset(self, key: str, value: Any) -> None:
+        """set() for async callers; backends doing blocking I/O run it off the event loop"""
+        self.set(key, value)
+
+    def clear(self) -> None:
+        self._clear()
+
+    async def aclear(self) -> None:
+        """clear() for async callers"""
+        self.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        entries = len(self)
+        with self._counter_lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "backend": self.name,
+            "entries": entries,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+    async def astats(self) -> Dict[str, Any]:
+        """stats() for async callers"""
+        return self.stats()
+
+    def _expires_at(self) -> Optional[float]:
+        return time.time() + self.ttl_seconds if self.ttl_seconds else None
+
+    @abstractmethod
+    def _get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    def _set(self, key: str, value: Any) -> None:
+        ...
+
+    @abstractmethod
+    def _clear(self) -> None:
+        ...
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+
+class NullCacheBackend(CacheBackend):
+    """Caching disabled: every lookup is a miss"""
+    name = "none"
+
+    def _get(self, key):
+        return None
+
+    def _set(self, key, value):
+        pass
+
+    def _clear(self):
+        pass
+
+    def __len__(self):
+        return 0
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU cache"""
+    name = "memory"
+
+    def __init__(self, ttl_seconds: Optional[float] = None, max_entries: int = 1000):
+        super().__init__(ttl_seconds, max_entries)
+        self._entries: "OrderedDict[str, tuple[Any, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, self._expires_at())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+class SqliteCacheBackend(CacheBackend):
+    """
+    On-disk LRU cache that survives restarts (values stored as JSON).
+
+    Hits don't write: their access times are kept in memory and written in
+    one batch with the next set() (or once `access_flush_entries` pile up).
+    Rows are only evicted once the table grows past `max_entries`. The async
+    methods (aget/aset/aclear/astats) run the SQLite calls in a worker thread.
+    """
+    name = "sqlite"
+
+    def __init__(
+        self,
+        path: str,
+        table: str = "cache",
+        ttl_seconds: Optional[float] = None,
+        max_entries: int = 1000,
+        access_flush_entries: int = 256
+    ):
+        super().__init__(ttl_seconds, max_entries)
+        self.path = path
+        self.table = table
+        self.access_flush_entries = access_flush_entries
+        self._lock = threading.Lock()
+        self._pending_access: Dict[str, float] = {}
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_last_access ON {table} (last_access)")
+        self._conn.commit()
+        # Upper bound on the row count (replaced keys are counted again until the next eviction)
+        self._rows = self._count()
+
+    async def aget(self, key):
+        return await anyio.to_thread.run_sync(self.get, key)
+
+    async def aset(self, key, value):
+        await anyio.to_thread.run_sync(self.set, key, value)
+
+    async def aclear(self):
+        await anyio.to_thread.run_sync(self.clear)
+
+    async def astats(self):
+        return await anyio.to_thread.run_sync(self.stats)
+
+    def _get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._pending_access.pop(key, None)
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._pending_access[key] = now
+            if len(self._pending_access) >= self.access_flush_entries:
+                self._flush_access()
+                self._conn.commit()
+            return json.loads(value)
+
+    def _set(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._pending_access.pop(key, None)
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), self._expires_at(), now)
+            )
+            self._flush_access()
+            self._rows += 1
+            if self._rows > self.max_entries:
+                self._evict(now)
+            self._conn.commit()
+
+    def _flush_access(self) -> None:
+        if self._pending_access:
+            self._conn.executemany(
+                f"UPDATE {self.table} SET last_access = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._pending_access.items()]
+            )
+            self._pending_access.clear()
+
+    def _evict(self, now: float) -> None:
+        # Drop expired rows, then the least recently used rows past the cap
+        self._conn.execute(f"DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        excess = self._count() - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f"SELECT key FROM {self.table} ORDER BY last_access LIMIT ?)",
+                (excess,)
+            )
+        self._rows = self._count()
+
+    def _count(self) -> int:
+        return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def _clear(self):
+        with self._lock:
+            self._pending_access.clear()
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+            self._rows = 0
+
+    def __len__(self):
+        with self._lock:
+            return self._count()
+
+
+def create_cache_backend(prefix: str, default_ttl_seconds: Optional[float] = None, default_max_entries: int = 1000) -> CacheBackend:
+    """
+    Build a cache backend from environment variables.
+
+    Reads <prefix>_CACHE_BACKEND (memory | sqlite | none),
+    <prefix>_CACHE_TTL_SECONDS, <prefix>_CACHE_MAX_ENTRIES and, for sqlite,
+    <prefix>_CACHE_PATH.
+
+    Args:
+        prefix: Env var prefix, e.g. "ANALYSIS"
+        default_ttl_seconds: TTL when the env var is unset (None = no expiry)
+        default_max_entries: Size cap when the env var is unset
+
+    Returns:
+        CacheBackend: The configured backend
+    """
+    backend = os.getenv(f"{prefix}_CACHE_BACKEND", "memory").lower()
+    ttl = os.getenv(f"{prefix}_CACHE_TTL_SECONDS")
+    ttl_seconds = float(ttl) if ttl else default_ttl_seconds
+    max_entries = int(os.getenv(f"{prefix}_CACHE_MAX_ENTRIES", str(default_max_entries)))
+
+    if backend == "sqlite":
+        path = os.getenv(f"{prefix}_CACHE_PATH", os.path.join(".cache", f"{prefix.lower()}_cache.sqlite3"))
+        return SqliteCacheBackend(path, table=f"{prefix.lower()}_cache", ttl_seconds=ttl_seconds, max_entries=max_entries)
+    if backend == "none":
+        return NullCacheBackend(ttl_seconds, max_entries)
+    return MemoryCacheBackend(ttl_seconds, max_entries)
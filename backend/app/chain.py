@@ -1,50 +1,219 @@
 """
 LangChain setup module for embeddings, vectorstore, and conversation chain.
 """
+import time
+_import_start = time.perf_counter()
+
 from dotenv import load_dotenv
+import asyncio
+import json
 import os
-from langchain_openai import OpenAIEmbeddings, ChatOpenAI
-from langchain_pinecone import PineconeVectorStore
-from langchain.memory import ConversationBufferMemory
-from pinecone import Pinecone
-from langchain.chains import (
-    create_history_aware_retriever,
-    create_retrieval_chain,
-)
+import re
+import threading
+import anyio
 from langchain.chains.combine_documents import create_stuff_documents_chain
+from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.runnables import RunnableBranch, RunnableLambda, RunnablePassthrough
+from memory_store import SessionMemoryStore
+from context_assembler import ContextAssembler
+from hybrid_retriever import HybridRetriever, LexicalIndex
+from model_router import classify_question, is_auto_routed, model_for
+from llm_clients import get_chat_model, get_embedding_model
+from semantic_cache import SemanticAnswerCache, ANSWER_CACHE_ENABLED
+from embedding_cache import CachedEmbeddings, create_persistent_tier
+from local_vectorstore import LocalVectorStore
+from startup_timing import record_since, record_timing
+from pipeline_metrics import metrics, record_stage
+from app_logging import get_logger
+from metrics_callbacks import stage_timing_handler
 load_dotenv()
 
-# Initialize Pinecone
-pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
+logger = get_logger("chain")
+
+# Skip the list_indexes() round-trip when the index is known to exist
+PINECONE_SKIP_INDEX_CHECK = os.getenv("PINECONE_SKIP_INDEX_CHECK", "false").lower() == "true"
+
+_pinecone_client = None
+
+
+def get_pinecone_client():
+    """
+    Get the Pinecone client, creating it on first use.
+
+    Created lazily so processes that never touch the vectorstore (e.g. the
+    deterministic scoring routes on Lambda) don't pay for it.
+
+    Returns:
+        Pinecone: The Pinecone client
+    """
+    global _pinecone_client
+
+    if _pinecone_client is None:
+        from pinecone import Pinecone
+        _pinecone_client = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
+
+    return _pinecone_client
+
+# Vectorstore backend: "pinecone" (default) or "local" (in-process index on disk)
+VECTORSTORE_BACKEND = os.getenv("VECTORSTORE_BACKEND", "pinecone").lower()
+LOCAL_INDEX_DIR = os.getenv("LOCAL_INDEX_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "index"))
+# Chunk manifests of Pinecone indexes, committed and shipped with the backend (BM25 corpus)
+CORPUS_DIR = os.getenv("CORPUS_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "corpus"))
+
+# Retrieval: "hybrid" (BM25 + vector, fused) or "vector" (similarity only)
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid").lower()
+RETRIEVAL_K = int(os.getenv("RETRIEVAL_K", "4"))
+
+# Question rewriting: a cheaper model (see model_router), used only when a follow-up needs it
+REWRITE_MODE = os.getenv("CHAT_REWRITE_MODE", "auto")  # auto | always | never
+
+# Words that usually mean a question leans on earlier turns
+FOLLOW_UP_PATTERN = re.compile(
+    r"\b(it|its|that|this|those|these|they|them|their|there|same|above|"
+    r"previous|earlier|else|also|instead|what about|how about)\b",
+    re.IGNORECASE
+)
+
+
+# Answer prompt for the student chatbot
+QA_SYSTEM_PROMPT = """You are a helpful assistant for question-answering tasks about the BSWD manual. \
+Use the following pieces of retrieved context to answer the question. \
+If you don't know the answer based on the context, say that you don't know. \
+
+CRITICAL RULES:
+1. Maximum 2 sentences OR 1 sentence + bullet list
+2. Each bullet should be concise but complete (15-20 words max)
+3. Use official terminology - accuracy over brevity
+4. Remove redundant phrases, but keep essential details
+5. Use bullet symbol (•) NOT dashes (-)
+
+Example format:
+
+Brief intro (1 sentence).
+
+- Short point one
+- Short point two
+- Short point three
+
+{context}"""
+
+# Policy instructions for the admin chatbot. The application/analysis
+# context is a per-turn prompt variable, so only the admin's question and the
+# answer are kept in history.
+ADMIN_SYSTEM_INSTRUCTIONS = """Instructions: You are assisting a BSWD administrator. Use the BSWD manual knowledge and the application/analysis context to provide clear, policy-backed answers.
+
+CRITICAL TERMINOLOGY:
+- "Federal/Provincial Need" = FUNDING REQUESTED
+- "Requested Items" = EQUIPMENT/SERVICE COSTS
+- Total Funding = Provincial + Federal
+- Total Equipment = Sum of requested items
+- Ratio = Total Funding / Total Equipment
+
+CONFIDENCE SCORING SYSTEM:
+
+The scoring is deterministic and correct. When explaining:
+1. Walk through each step (Eligibility -> Funding -> Ratio)
+2. Cite specific penalties with dollar amounts
+3. Never suggest the logic might be wrong
+4. Explain manual overrides are available
+
+Funding Limits (by OSAP type):
+- Full-time OSAP: BSWD $2K (provincial) + CSG $20K (federal) = $22K max
+- Part-time OSAP: BSWD $2K (provincial) only, NO federal CSG
+- No OSAP: BSWD $2K (provincial) only, NO federal CSG
+
+Step 1 - Eligibility (-33 each):
+- No verified permanent/persistent disability
+- Has OSAP restrictions
+
+Step 2 - Funding Limits (-30 each, can stack):
+- Provincial funding > $2,000
+- Federal funding > $20,000 (full-time only)
+- Federal funding > $0 (part-time or no OSAP)
+
+Step 3 - Funding/Equipment Ratio (ratio = funding / equipment):
+- Ratio >= 4.0: -60 (severe over-funding)
+- Ratio >= 2.0: -30 (major over-funding)
+- Ratio > 1.2: -15 (funding exceeds equipment 21%+)
+- Ratio 1.0-1.2: -2 per 10% (funding 0-20% over equipment)
+- Ratio <= 0.5: -15 (major funding gap)
+- Ratio 0.5-1.0: -5 (minor funding gap)
+
+Thresholds: 90+=APPROVED | 75-89=MANUAL REVIEW | 0-74=REJECTED
+
+Examples:
+- Equipment $6,900, Funding $4,459 -> Ratio 0.646 -> Gap $2,441 -> -5 -> Score 95 -> APPROVED
+- Equipment $6,900, Funding $10,000 -> Ratio 1.449 -> Excess $3,100 -> -15 -> Score 85 -> MANUAL REVIEW"""
+
+ADMIN_QA_SYSTEM_PROMPT = ADMIN_SYSTEM_INSTRUCTIONS + """
+
+BSWD MANUAL EXCERPTS:
+{context}
+
+CURRENT APPLICATION CONTEXT:
+{application_context}
+
+Answer the admin's question with confidence in the scoring system."""
+
+
+EMBEDDING_MODEL = "text-embedding-ada-002"
+_embeddings = None
 
 
 def get_embeddings():
     """
-    Initialize and return OpenAI embeddings model.
+    Return the shared OpenAI embeddings model, wrapped in a query embedding cache.
     
     Returns:
-        OpenAIEmbeddings: The embeddings model instance
+        CachedEmbeddings: The embeddings model instance
     """
-    return OpenAIEmbeddings(
-        model="text-embedding-ada-002",
-        openai_api_key=os.getenv("OPENAI_API_KEY")
-    )
+    global _embeddings
+
+    if _embeddings is None:
+        _embeddings = CachedEmbeddings(
+            get_embedding_model(EMBEDDING_MODEL),
+            model_name=EMBEDDING_MODEL,
+            persistent_tier=create_persistent_tier()
+        )
+
+    return _embeddings
+
+def get_local_index_path(index_name: str) -> str:
+    """Directory holding the local index files for an index name"""
+    return os.path.join(LOCAL_INDEX_DIR, index_name)
+
+def get_manifest_path(index_name: str) -> str:
+    """Directory holding the ingestion manifest: next to a local index, in CORPUS_DIR for Pinecone"""
+    if VECTORSTORE_BACKEND == "local":
+        return get_local_index_path(index_name)
+    return os.path.join(CORPUS_DIR, index_name)
 
 def get_vectorstore(index_name: str):
     """
-    Get the Pinecone vectorstore for the specified index.
+    Get the vectorstore for the specified index.
+
+    Uses Pinecone by default; with VECTORSTORE_BACKEND=local the index is
+    loaded from LOCAL_INDEX_DIR/<index_name> and searched in-process.
     
     Args:
-        index_name: Name of the Pinecone index
+        index_name: Name of the Pinecone index (or local index directory)
         
     Returns:
-        PineconeVectorStore: The vectorstore instance
+        VectorStore: The PineconeVectorStore or LocalVectorStore instance
     """
     embeddings = get_embeddings()
     
+    if VECTORSTORE_BACKEND == "local":
+        path = get_local_index_path(index_name)
+        if not LocalVectorStore.exists(path):
+            raise ValueError(f"Local index '{path}' does not exist. Please run ingestion first.")
+        return LocalVectorStore.load(path, embeddings)
+    
+    from langchain_pinecone import PineconeVectorStore
+
     # Check if index exists
-    if index_name not in pc.list_indexes().names():
+    if not PINECONE_SKIP_INDEX_CHECK and index_name not in get_pinecone_client().list_indexes().names():
         raise ValueError(f"Index '{index_name}' does not exist. Please run ingestion first.")
     
     vectorstore = PineconeVectorStore(
@@ -55,7 +224,123 @@ def get_vectorstore(index_name: str):
     return vectorstore
 
 
-def get_conversation_chain(vectorstore, index_name: str):
+def _load_lexical_index_from_pinecone(retriever: HybridRetriever, index_name: str) -> None:
+    """Build the BM25 index from Pinecone metadata and hand it to a running retriever"""
+    try:
+        with record_timing("lexical_index_from_pinecone"):
+            lexical_index = LexicalIndex.from_pinecone(get_pinecone_client().Index(index_name))
+    except Exception as e:
+        logger.error(f"Could not read chunks from Pinecone index '{index_name}', staying VECTOR-ONLY: {e}")
+        return
+    if not lexical_index:
+        logger.error(f"Pinecone index '{index_name}' has no chunk text, staying VECTOR-ONLY")
+        return
+    retriever.set_lexical_index(lexical_index)
+    logger.info(f"Hybrid retrieval ready: BM25 index built from {len(lexical_index)} Pinecone chunks")
+
+
+def get_retriever(vectorstore, index_name: str):
+    """
+    Build the retriever used by the conversation chains.
+
+    In hybrid mode the BM25 index is built from the ingestion manifest,
+    which for Pinecone is shipped with the backend in CORPUS_DIR (or a
+    development copy under LOCAL_INDEX_DIR), and for a local index from
+    the index itself. If a Pinecone deployment has no manifest, the index
+    is read back from Pinecone metadata in a background thread; until it
+    is ready (or if that fails) retrieval is vector-only, and this is
+    logged as an error.
+
+    Args:
+        vectorstore: The Pinecone or local vectorstore
+        index_name: Name of the index (locates the ingestion manifest)
+
+    Returns:
+        BaseRetriever: A HybridRetriever or a plain vectorstore retriever
+    """
+    if RETRIEVAL_MODE == "hybrid":
+        lexical_index = LexicalIndex.from_manifest(get_manifest_path(index_name))
+        if lexical_index is None:
+            lexical_index = LexicalIndex.from_manifest(get_local_index_path(index_name))
+        if lexical_index is None and isinstance(vectorstore, LocalVectorStore):
+            lexical_index = LexicalIndex(vectorstore.documents())
+        if lexical_index:
+            return HybridRetriever.create(vectorstore, lexical_index, k=RETRIEVAL_K)
+
+        if VECTORSTORE_BACKEND == "pinecone":
+            from langchain_pinecone import PineconeVectorStore
+            if isinstance(vectorstore, PineconeVectorStore):
+                logger.error(
+                    f"No chunk manifest shipped for '{index_name}' in {CORPUS_DIR}; retrieval is VECTOR-ONLY "
+                    "until the BM25 index has been read back from Pinecone (run ingestion and deploy the manifest)"
+                )
+                retriever = HybridRetriever.create(vectorstore, k=RETRIEVAL_K)
+                threading.Thread(
+                    target=_load_lexical_index_from_pinecone, args=(retriever, index_name),
+                    name="bm25-from-pinecone", daemon=True
+                ).start()
+                return retriever
+
+        logger.error(
+            f"RETRIEVAL_MODE=hybrid but no chunks found for '{index_name}'; "
+            "falling back to VECTOR-ONLY retrieval (set RETRIEVAL_MODE=vector to silence this)"
+        )
+
+    return vectorstore.as_retriever(
+        search_type="similarity",
+        search_kwargs={"k": RETRIEVAL_K}
+    )
+
+
+def needs_rewrite(question: str, chat_history) -> bool:
+    """
+    Decide whether a question must be rewritten into a standalone one.
+
+    With no history there is nothing to resolve. Otherwise short questions
+    and questions containing follow-up words are rewritten; long
+    self-contained questions go straight to retrieval.
+
+    Args:
+        question: The user's question
+        chat_history: Prior messages for this session
+
+    Returns:
+        bool: True if the rewrite LLM call is needed
+    """
+    if not chat_history or REWRITE_MODE == "never":
+        return False
+    if REWRITE_MODE == "always":
+        return True
+    return len(question.split()) <= 4 or bool(FOLLOW_UP_PATTERN.search(question))
+
+
+def create_fast_path_retriever(llm, retriever, prompt):
+    """
+    History-aware retriever that skips the rewrite call when it isn't needed.
+
+    Args:
+        llm: Model used to rewrite follow-up questions
+        retriever: The vectorstore retriever
+        prompt: Contextualize-question prompt
+
+    Returns:
+        Runnable: Takes {"input", "chat_history"} and returns documents
+    """
+    rewrite_then_retrieve = prompt | llm.with_config(run_name="rewrite_question") | StrOutputParser() | retriever
+
+    return RunnableBranch(
+        (lambda x: needs_rewrite(x["input"], x.get("chat_history")), rewrite_then_retrieve),
+        (lambda x: x["input"]) | retriever,
+    ).with_config(run_name="chat_retriever_chain")
+
+
+def get_conversation_chain(
+    vectorstore,
+    index_name: str,
+    qa_system_prompt: str = QA_SYSTEM_PROMPT,
+    retriever=None,
+    model_route: str = "answer"
+):
     """
     Create and return a conversational retrieval chain with memory.
     
@@ -65,23 +350,16 @@ def get_conversation_chain(vectorstore, index_name: str):
     Args:
         vectorstore: The Pinecone vectorstore instance
         index_name: Name of the Pinecone index
+        qa_system_prompt: System prompt for answering; must contain {context}
+            and may reference extra per-turn input variables
+        retriever: Retriever to use (defaults to get_retriever(vectorstore, index_name))
+        model_route: model_router call site that picks the answer model
         
     Returns:
-        tuple: (conversation_chain, memory) - The chain and memory instance
+        tuple: (conversation_chain, memory_store) - The chain and per-session memory store
     """
-    # Initialize the LLM
-    llm = ChatOpenAI(
-        model="gpt-4-turbo-preview",  # Fixed model name
-        temperature=0.7,
-        openai_api_key=os.getenv("OPENAI_API_KEY")
-    )
-    
-    # Set up memory for conversation history
-    memory = ConversationBufferMemory(
-        memory_key="chat_history",
-        return_messages=True,
-        output_key="answer"
-    )
+    # Set up per-session memory for conversation history
+    memory_store = SessionMemoryStore()
 
     # Prompt for contextualizing questions based on chat history
     contextualize_q_system_prompt = """Given a chat history and the latest user question \
@@ -95,150 +373,387 @@ just reformulate it if needed and otherwise return it as is."""
         ("human", "{input}"),
     ])
     
-    # Create history-aware retriever
-    history_aware_retriever = create_history_aware_retriever(
-        llm=llm,
-        retriever=vectorstore.as_retriever(
-            search_type="similarity",
-            search_kwargs={"k": 4}
-        ),
+    # Create history-aware retriever (rewrites follow-ups with the cheaper model only)
+    history_aware_retriever = create_fast_path_retriever(
+        llm=get_chat_model(model_for("rewrite"), temperature=0),
+        retriever=retriever or get_retriever(vectorstore, index_name),
         prompt=contextualize_q_prompt,
     )
     
     # Prompt for answering questions
-    qa_system_prompt = """You are a helpful assistant for question-answering tasks about the BSWD manual. \
-Use the following pieces of retrieved context to answer the question. \
-If you don't know the answer based on the context, say that you don't know. \
-
-CRITICAL RULES:
-1. Maximum 2 sentences OR 1 sentence + bullet list
-2. Each bullet should be concise but complete (15-20 words max)
-3. Use official terminology - accuracy over brevity
-4. Remove redundant phrases, but keep essential details
-5. Use bullet symbol (•) NOT dashes (-)
-
-Example format:
-
-Brief intro (1 sentence).
-
-- Short point one
-- Short point two
-- Short point three
-
-{context}"""
-
     qa_prompt = ChatPromptTemplate.from_messages([
         ("system", qa_system_prompt),
         MessagesPlaceholder("chat_history"),
         ("human", "{input}"),
     ])
     
-    # Create the question-answer chain
-    question_answer_chain = create_stuff_documents_chain(llm, qa_prompt)
+    # Create the question-answer chain with the shared, connection-pooled LLM for this route
+    def create_qa_chain(model: str):
+        return create_stuff_documents_chain(get_chat_model(model, temperature=0.7).with_config(run_name="answer"), qa_prompt)
+
+    if is_auto_routed(model_route):
+        # Simple lookups go to the small model, everything else to the large one
+        question_answer_chain = RunnableBranch(
+            (lambda x: classify_question(x["input"]) == "complex", create_qa_chain(model_for(model_route, "complex"))),
+            create_qa_chain(model_for(model_route, "simple")),
+        ).with_config(run_name="route_answer_model")
+    else:
+        question_answer_chain = create_qa_chain(model_for(model_route))
     
-    # Create the full retrieval chain
-    rag_chain = create_retrieval_chain(
-        history_aware_retriever,
-        question_answer_chain
-    )
+    # Keep history and retrieved chunks inside a fixed token budget
+    assembler = ContextAssembler()
+
+    # Create the full retrieval chain (create_retrieval_chain plus budgeting):
+    # history is compressed before the rewrite, chunks are trimmed before the answer
+    rag_chain = (
+        RunnablePassthrough.assign(chat_history=lambda x: assembler.compress_history(x.get("chat_history")))
+        | RunnablePassthrough.assign(context=history_aware_retriever.with_config(run_name="retrieve_documents"))
+        | RunnableLambda(assembler.assemble).with_config(run_name="assemble_context")
+        | RunnablePassthrough.assign(answer=question_answer_chain)
+    ).with_config(run_name="retrieval_chain")
     
-    return rag_chain, memory
+    # Per-stage timings and token counts for /metrics
+    return rag_chain.with_config(callbacks=[stage_timing_handler]), memory_store
 
 
-def chat_with_memory(chain, memory, question: str):
+async def _lookup_cached_answer(answer_cache, question: str, chat_history):
     """
-    Execute a chat query with memory management.
-    
+    Check the semantic answer cache for a question.
+
+    Only first-turn questions are eligible, since with history the raw
+    question is not standalone. Cache errors are treated as misses.
+
+    Returns:
+        tuple: (question_vector, cached_response) - either may be None
+    """
+    if answer_cache is None or chat_history or not answer_cache.accepts(question):
+        return None, None
+    try:
+        vector = await answer_cache.aembed(question)
+        return vector, answer_cache.lookup(vector, question)
+    except Exception as e:
+        logger.warning("Answer cache lookup failed: %s", e)
+        return None, None
+
+
+async def achat_with_memory(chain, memory, question: str, answer_cache=None, ephemeral_inputs=None):
+    """
+    Execute a chat query with memory management without blocking the event loop.
+
+    Awaits the chain so concurrent requests on one worker overlap their
+    retrieval and LLM round-trips.
+
     Args:
         chain: The conversation chain
         memory: The conversation memory instance
         question: The user's question
-        
+        answer_cache: Optional SemanticAnswerCache checked before running the chain
+        ephemeral_inputs: Extra prompt variables for this turn only (never saved to memory)
+
     Returns:
         dict: Response containing 'answer' and 'context' (source documents)
     """
     # Get chat history from memory
-    chat_history = memory.load_memory_variables({}).get("chat_history", [])
-    
-    # Invoke the chain
-    response = chain.invoke({
-        "input": question,
-        "chat_history": chat_history
-    })
-    
+    with record_stage("memory_load"):
+        chat_history = memory.load_memory_variables({}).get("chat_history", [])
+
+    vector, cached = await _lookup_cached_answer(answer_cache, question, chat_history)
+    if cached is not None:
+        answer, source_documents = cached["answer"], cached["source_documents"]
+    else:
+        # Invoke the chain asynchronously
+        response = await chain.ainvoke({
+            **(ephemeral_inputs or {}),
+            "input": question,
+            "chat_history": chat_history
+        })
+        answer, source_documents = response["answer"], response.get("context", [])
+        if vector is not None:
+            answer_cache.store(vector, question, answer, source_documents)
+
     # Save to memory
-    memory.save_context(
-        {"input": question},
-        {"answer": response["answer"]}
-    )
-    
+    with record_stage("memory_save"):
+        memory.save_context(
+            {"input": question},
+            {"answer": answer}
+        )
+
     return {
-        "answer": response["answer"],
-        "source_documents": response.get("context", [])
+        "answer": answer,
+        "source_documents": source_documents
     }
 
-def chat_with_memory_stream(chain, memory, question: str):
+def serialize_documents(documents) -> list:
+    """
+    Convert retrieved documents into JSON-safe dicts.
+
+    Args:
+        documents: Retrieved LangChain documents (or plain values)
+
+    Returns:
+        list: [{"content": ..., "metadata": ...}] for each document
+    """
+    return [
+        {
+            "content": doc.page_content if hasattr(doc, "page_content") else str(doc),
+            "metadata": doc.metadata if hasattr(doc, "metadata") else {}
+        }
+        for doc in documents
+    ]
+
+
+def format_sse(event: str, data) -> str:
+    """Frame a payload as a server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def achat_with_memory_stream(
+    chain,
+    memory,
+    question: str,
+    sse: bool = False,
+    include_sources: bool = False,
+    answer_cache=None,
+    ephemeral_inputs=None
+):
     """
-    Execute a chat query with memory management.
+    Stream a chat answer asynchronously with memory management.
+
+    Runs on chain.astream, so no threadpool worker is held per stream and
+    tokens are only pulled from the LLM as fast as the client reads them.
+    If the client disconnects, Starlette cancels this generator and the
+    upstream stream is closed so the LLM stops generating. Memory is
+    committed exactly once, with whatever answer was produced.
 
     Args:
         chain: The conversation chain
         memory: The conversation memory instance
         question: The user's question
-        
-    Yeild:
-        dict: Response containing 'answer' and 'context' (source documents)
-    """
+        sse: Frame output as server-sent events instead of raw text
+        include_sources: Emit a 'sources' event with the retrieved documents (SSE only)
+        answer_cache: Optional SemanticAnswerCache checked before running the chain
+        ephemeral_inputs: Extra prompt variables for this turn only (never saved to memory)
 
+    Yields:
+        str: Answer tokens, or SSE frames when sse=True
+    """
     # Get chat history from memory
-    chat_history = memory.load_memory_variables({}).get("chat_history", [])
+    with record_stage("memory_load"):
+        chat_history = memory.load_memory_variables({}).get("chat_history", [])
+
+    vector, cached = await _lookup_cached_answer(answer_cache, question, chat_history)
+    if cached is not None:
+        if sse and include_sources:
+            yield format_sse("sources", serialize_documents(cached["source_documents"]))
+        yield format_sse("token", {"token": cached["answer"]}) if sse else cached["answer"]
+        if sse:
+            yield format_sse("done", {})
+        with record_stage("memory_save"):
+            memory.save_context(
+                {"input": question},
+                {"answer": cached["answer"]}
+            )
+        return
 
-    # Invoke the chain (stream)
-    response_stream = chain.stream({
+    response_stream = chain.astream({
+        **(ephemeral_inputs or {}),
         "input": question,
         "chat_history": chat_history
     })
 
-    full_response = {
-        "answer": "",
-        "context": []
-    }
+    answer = ""
+    source_documents = []
+    completed = False
+    stream_start = time.perf_counter()
+    try:
+        async for chunk in response_stream:
+            if "answer" in chunk:
+                token_answer = chunk["answer"]
+                if not answer and token_answer:
+                    metrics.observe("first_token", time.perf_counter() - stream_start)
+                answer += token_answer
+                yield format_sse("token", {"token": token_answer}) if sse else token_answer
+            elif "context" in chunk:
+                source_documents = chunk["context"]
+                if sse and include_sources:
+                    yield format_sse("sources", serialize_documents(source_documents))
 
-    # Return answer token by token
-    for chunk in response_stream:
-        if "answer" in chunk:
-            token_answer = chunk["answer"]
-            full_response["answer"] += token_answer
-            yield token_answer
-        # Context is not used right now
-        # elif "context" in chunk:
-        #     token_context= chunk["context"]
-        #     full_response["context"] += token_context
-
-    # Save to memory after sending all the tokens
-    memory.save_context(
-        {"input": question},
-        {"answer": full_response["answer"]}
-    )
+        completed = True
+        if sse:
+            yield format_sse("done", {})
+    finally:
+        # Shield the cleanup so it still runs when the stream was cancelled
+        with anyio.CancelScope(shield=True):
+            await response_stream.aclose()
 
-# Global conversation chain and memory instances
-_conversation_chain = None
-_memory = None
+        if answer:
+            with record_stage("memory_save"):
+                memory.save_context(
+                    {"input": question},
+                    {"answer": answer}
+                )
+        # Never cache a partial answer from a cancelled stream
+        if completed and vector is not None:
+            answer_cache.store(vector, question, answer, source_documents)
+
+# Global (chain, memory_store) pairs for the student and admin chatbots,
+# published together so readers never see a mix of two builds
+_chain_state = None
+_chain_lock = threading.Lock()
+_reload_lock = threading.Lock()
+# The cold build running in a worker thread, awaited by every async caller
+_chain_build_task = None
+_answer_cache = None
+
+
+def get_answer_cache():
+    """
+    Get the global semantic answer cache for the student chatbot.
+
+    Returns:
+        SemanticAnswerCache: The cache, or None when ANSWER_CACHE_ENABLED is false
+    """
+    global _answer_cache
+
+    if _answer_cache is None and ANSWER_CACHE_ENABLED:
+        _answer_cache = SemanticAnswerCache(get_embeddings())
+
+    return _answer_cache
+
+
+def _build_chain():
+    index_name = os.getenv("PINECONE_INDEX_NAME", "bswd-manual")
+    with record_timing("vectorstore_init"):
+        vectorstore = get_vectorstore(index_name)
+    with record_timing("retriever_init"):
+        retriever = get_retriever(vectorstore, index_name)
+    with record_timing("chain_init"):
+        return {
+            "student": get_conversation_chain(vectorstore, index_name, retriever=retriever),
+            "admin": get_conversation_chain(
+                vectorstore, index_name,
+                qa_system_prompt=ADMIN_QA_SYSTEM_PROMPT,
+                retriever=retriever,
+                model_route="admin_answer"
+            )
+        }
+
+
+def _get_or_create_state():
+    global _chain_state
+
+    state = _chain_state
+    if state is not None:
+        return state
+
+    with _chain_lock:
+        if _chain_state is None:
+            _chain_state = _build_chain()
+        return _chain_state
+
+
+async def _aget_or_create_state():
+    global _chain_build_task
+
+    state = _chain_state
+    if state is not None:
+        return state
+
+    # One shared build per loop; a failed build is retried by the next caller
+    task = _chain_build_task
+    loop = asyncio.get_running_loop()
+    if task is None or task.get_loop() is not loop or (task.done() and task.exception() is not None):
+        task = _chain_build_task = loop.create_task(anyio.to_thread.run_sync(_get_or_create_state))
+    # shield: a cancelled request must not cancel the build the others wait on
+    return await asyncio.shield(task)
+
+
+def is_chain_loaded() -> bool:
+    """Whether the global chain has been built (without building it)"""
+    return _chain_state is not None
 
 
 def get_or_create_chain():
     """
-    Get or create the global conversation chain and memory instances.
+    Get or create the global conversation chain and session memory store.
     This ensures we reuse the same chain across requests.
+
+    Initialization is single-flight: concurrent callers on a cold process
+    wait for the one build in progress instead of starting their own.
+    This blocks the calling thread for the whole build; async code should
+    use aget_or_create_chain.
     
     Returns:
-        tuple: (chain, memory) - The conversation chain and memory instances
+        tuple: (chain, memory_store) - The conversation chain and session memory store
     """
-    global _conversation_chain, _memory
-    
-    if _conversation_chain is None or _memory is None:
-        index_name = os.getenv("PINECONE_INDEX_NAME", "bswd-manual")
-        vectorstore = get_vectorstore(index_name)
-        _conversation_chain, _memory = get_conversation_chain(vectorstore, index_name)
-    
-    return _conversation_chain, _memory
\ No newline at end of file
+    return _get_or_create_state()["student"]
+
+
+def get_admin_chain():
+    """
+    Get or create the admin chatbot chain and its session memory store.
+
+    Shares the vectorstore with the student chain but answers with the
+    admin policy prompt. Callers pass the application/analysis context as
+    the `application_context` input on each turn.
+
+    Returns:
+        tuple: (chain, memory_store) - The admin chain and its session memory store
+    """
+    return _get_or_create_state()["admin"]
+
+
+async def aget_or_create_chain():
+    """
+    Async get_or_create_chain for request handlers.
+
+    A cold build (vectorstore, BM25 index, chains) runs in a worker thread,
+    so the event loop keeps serving other routes meanwhile; concurrent
+    callers await the same build.
+
+    Returns:
+        tuple: (chain, memory_store) - The conversation chain and session memory store
+    """
+    return (await _aget_or_create_state())["student"]
+
+
+async def aget_admin_chain():
+    """
+    Async get_admin_chain for request handlers (see aget_or_create_chain).
+
+    Returns:
+        tuple: (chain, memory_store) - The admin chain and its session memory store
+    """
+    return (await _aget_or_create_state())["admin"]
+
+
+def reload_chain():
+    """
+    Rebuild the chain (e.g. after re-ingesting the manual) and swap it in atomically.
+
+    The new chain is built while the old one keeps serving; requests that
+    already hold the old chain finish with it. Session memory is carried
+    over so conversations survive the reload, and cached answers are
+    dropped since they may cite the old index. If the build fails the
+    old chain stays in place.
+
+    Returns:
+        tuple: (chain, memory_store) - The new student chain and its session memory store
+    """
+    global _chain_state
+
+    with _reload_lock:
+        state = _build_chain()
+        with _chain_lock:
+            if _chain_state is not None:
+                state = {name: (chain, _chain_state[name][1]) for name, (chain, _) in state.items()}
+            _chain_state = state
+
+    answer_cache = get_answer_cache()
+    if answer_cache:
+        answer_cache.invalidate()
+
+    return state["student"]
+
+
+record_since("import_chain", _import_start)
@@ -0,0 +1,176 @@
+"""
+Context Assembler
+Fits retrieved chunks and chat history into a fixed prompt token budget
+"""
+
+import os
+import re
+from typing import Any, Dict, List, Sequence
+
+from langchain_core.documents import Document
+from langchain_core.messages import BaseMessage, HumanMessage
+
+from token_counter import TOKENS_PER_MESSAGE, count_message_tokens, count_tokens, truncate_to_tokens
+
+# Tokens shared by the retrieved chunks and the chat history in one prompt
+CONTEXT_MAX_TOKENS = int(os.getenv("CONTEXT_MAX_TOKENS", "2500"))
+# Most of that budget the history may take; the rest always goes to chunks
+CONTEXT_HISTORY_MAX_TOKENS = int(os.getenv("CONTEXT_HISTORY_MAX_TOKENS", "800"))
+# Older history messages are cut to this many tokens (the latest turn is kept whole)
+CONTEXT_HISTORY_MESSAGE_TOKENS = int(os.getenv("CONTEXT_HISTORY_MESSAGE_TOKENS", "150"))
+# Drop a chunk when this share of its word 5-grams already appears in kept chunks
+CONTEXT_DUPLICATE_THRESHOLD = float(os.getenv("CONTEXT_DUPLICATE_THRESHOLD", "0.8"))
+
+# Chunks are joined with "\n\n" by the stuff-documents chain
+TOKENS_PER_DOCUMENT = 2
+# Shortest shared prefix/suffix treated as splitter overlap rather than coincidence
+MIN_OVERLAP_CHARS = 50
+SHINGLE_SIZE = 5
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def _shingles(text: str) -> set:
+    words = _WORD_PATTERN.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return {tuple(words)} if words else set()
+    return {tuple(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def _overlap_length(head: str, tail: str) -> int:
+    """Length of the longest suffix of `head` that is also a prefix of `tail`"""
+    probe = tail[:MIN_OVERLAP_CHARS]
+    if len(probe) < MIN_OVERLAP_CHARS:
+        return 0
+    start = head.find(probe)
+    while start != -1:
+        if tail.startswith(head[start:]):
+            return len(head) - start
+        start = head.find(probe, start + 1)
+    return 0
+
+
+def _rank(documents: Sequence[Document]) -> List[Document]:
+    """Highest score first; without scores, keep the retriever's (best-first) order"""
+    if all("score" in doc.metadata for doc in documents):
+        return sorted(documents, key=lambda doc: doc.metadata["score"], reverse=True)
+    return list(documents)
+
+
+class ContextAssembler:
+    """
+    Trims the inputs of the QA prompt to a token budget.
+
+    History is compressed first (older messages shortened, then the
+    oldest dropped) and the remaining budget is filled with chunks in
+    score order, so the lowest-scoring chunks are the ones left out.
+    Near-duplicate chunks are skipped and text that a chunk shares with an
+    already selected neighbour (text-splitter overlap) is cut.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = CONTEXT_MAX_TOKENS,
+        history_max_tokens: int = CONTEXT_HISTORY_MAX_TOKENS,
+        history_message_tokens: int = CONTEXT_HISTORY_MESSAGE_TOKENS,
+        duplicate_threshold: float = CONTEXT_DUPLICATE_THRESHOLD
+    ):
+        self.max_tokens = max_tokens
+        self.history_max_tokens = min(history_max_tokens, max_tokens)
+        self.history_message_tokens = history_message_tokens
+        self.duplicate_threshold = duplicate_threshold
+
+    def compress_history(self, messages: Sequence[BaseMessage]) -> List[BaseMessage]:
+        """
+        Fit chat history into the history budget.
+
+        Args:
+            messages: Oldest-first chat history
+
+        Returns:
+            List[BaseMessage]: The compressed history, still starting with a user message
+        """
+        messages = list(messages or [])
+        if not messages or count_message_tokens(messages) <= self.history_max_tokens:
+            return messages
+
+        # Keep the latest turn whole; it is what follow-up questions refer to
+        compressed = [
+            message if i >= len(messages) - 2 else self._shorten(message, self.history_message_tokens)
+            for i, message in enumerate(messages)
+        ]
+
+        while len(compressed) > 1 and count_message_tokens(compressed) > self.history_max_tokens:
+            compressed.pop(0)
+        if count_message_tokens(compressed) > self.history_max_tokens:
+            compressed = [self._shorten(compressed[0], self.history_max_tokens - TOKENS_PER_MESSAGE)]
+
+        while compressed and not isinstance(compressed[0], HumanMessage):
+            compressed.pop(0)
+        return compressed
+
+    def select_documents(self, documents: Sequence[Document], max_tokens: int) -> List[Document]:
+        """
+        Pick the best chunks that fit in `max_tokens`.
+
+        Args:
+            documents: Retrieved chunks, best first (or with a "score" in metadata)
+            max_tokens: Token budget for the chunks
+
+        Returns:
+            List[Document]: Selected chunks, best first, with shared overlap removed
+        """
+        selected: List[Document] = []
+        seen_shingles: set = set()
+        used = 0
+
+        for doc in _rank(documents):
+            text = doc.page_content
+            shingles = _shingles(text)
+            if selected and shingles and len(shingles & seen_shingles) / len(shingles) >= self.duplicate_threshold:
+                continue
+
+            text = self._strip_overlap(text, selected)
+            if not text.strip():
+                continue
+
+            tokens = count_tokens(text) + TOKENS_PER_DOCUMENT
+            if used + tokens > max_tokens:
+                if selected:
+                    continue
+                # Always answer from something: cut the best chunk down to the budget
+                text = truncate_to_tokens(text, max_tokens - TOKENS_PER_DOCUMENT)
+                tokens = max_tokens
+
+            selected.append(Document(page_content=text, metadata=dict(doc.metadata), id=doc.id))
+            seen_shingles |= shingles
+            used += tokens
+
+        return selected
+
+    def assemble(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """Compress "chat_history" and trim "context" documents to the budget"""
+        history = self.compress_history(inputs.get("chat_history") or [])
+        documents = inputs.get("context") or []
+        budget = self.max_tokens - count_message_tokens(history)
+        return {**inputs, "chat_history": history, "context": self.select_documents(documents, budget)}
+
+    def _shorten(self, message: BaseMessage, max_tokens: int) -> BaseMessage:
+        content = str(message.content)
+        shortened = truncate_to_tokens(content, max_tokens)
+        if shortened == content:
+            return message
+        return message.__class__(content=shortened.rstrip() + " ...")
+
+    def _strip_overlap(self, text: str, selected: Sequence[Document]) -> str:
+        for doc in selected:
+            kept = doc.page_content
+            # This chunk continues a selected one: drop the repeated start
+            overlap = _overlap_length(kept, text)
+            if overlap:
+                text = text[overlap:]
+            # This chunk precedes a selected one: drop the repeated end
+            overlap = _overlap_length(text, kept)
+            if overlap:
+                text = text[:-overlap]
+        return text
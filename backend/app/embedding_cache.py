@@ -0,0 +1,138 @@
+"""
+Embedding Cache
+Two-tier (in-memory LRU + SQLite) cache for query embeddings
+"""
+
+import hashlib
+import os
+from typing import Any, Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from cache_backends import CacheBackend, MemoryCacheBackend, SqliteCacheBackend
+from pipeline_metrics import record_stage
+from app_logging import get_logger
+
+logger = get_logger("embedding_cache")
+
+EMBEDDING_CACHE_MEMORY_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MEMORY_ENTRIES", "2048"))
+EMBEDDING_CACHE_PERSIST = os.getenv("EMBEDDING_CACHE_PERSIST", "sqlite").lower()  # sqlite | none
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", os.path.join(".cache", "embedding_cache.sqlite3"))
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "50000"))
+
+
+def normalize_text(text: str) -> str:
+    """Strip and collapse whitespace (case is kept, it can change the embedding)"""
+    return " ".join(text.split())
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that caches query embeddings.
+
+    Lookups go to the in-memory LRU first, then the persistent tier; a
+    persistent hit is promoted to memory. Document embeddings (ingestion)
+    pass straight through since they are rarely repeated.
+    """
+
+    def __init__(
+        self,
+        underlying: Embeddings,
+        model_name: str,
+        memory_tier: Optional[CacheBackend] = None,
+        persistent_tier: Optional[CacheBackend] = None
+    ):
+        self.underlying = underlying
+        self.model_name = model_name
+        self.memory_tier = memory_tier or MemoryCacheBackend(max_entries=EMBEDDING_CACHE_MEMORY_ENTRIES)
+        self.persistent_tier = persistent_tier
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\x00{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+    def _lookup(self, key: str) -> Optional[List[float]]:
+        vector = self.memory_tier.get(key)
+        if vector is None and self.persistent_tier is not None:
+            vector = self.persistent_tier.get(key)
+            if vector is not None:
+                self.memory_tier.set(key, vector)
+        return vector
+
+    def _store(self, key: str, vector: List[float]) -> None:
+        self.memory_tier.set(key, vector)
+        if self.persistent_tier is not None:
+            self.persistent_tier.set(key, vector)
+
+    async def _alookup(self, key: str) -> Optional[List[float]]:
+        vector = self.memory_tier.get(key)
+        if vector is None and self.persistent_tier is not None:
+            vector = await self.persistent_tier.aget(key)
+            if vector is not None:
+                self.memory_tier.set(key, vector)
+        return vector
+
+    async def _astore(self, key: str, vector: List[float]) -> None:
+        self.memory_tier.set(key, vector)
+        if self.persistent_tier is not None:
+            await self.persistent_tier.aset(key, vector)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key(text)
+        vector = self._lookup(key)
+        if vector is None:
+            with record_stage("embed_query"):
+                vector = self.underlying.embed_query(normalize_text(text))
+            self._store(key, vector)
+        return vector
+
+    async def aembed_query(self, text: str) -> List[float]:
+        key = self._key(text)
+        vector = await self._alookup(key)
+        if vector is None:
+            with record_stage("embed_query"):
+                vector = await self.underlying.aembed_query(normalize_text(text))
+            await self._astore(key, vector)
+        return vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.underlying.embed_documents(texts)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.underlying.aembed_documents(texts)
+
+    def stats(self) -> Dict[str, Any]:
+        persistent = self.persistent_tier.stats() if self.persistent_tier is not None else None
+        return self._combine_stats(persistent)
+
+    async def astats(self) -> Dict[str, Any]:
+        """stats() without blocking the event loop on the persistent tier"""
+        persistent = await self.persistent_tier.astats() if self.persistent_tier is not None else None
+        return self._combine_stats(persistent)
+
+    def _combine_stats(self, persistent: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        memory = self.memory_tier.stats()
+        lookups = memory["hits"] + memory["misses"]
+        hits = memory["hits"] + (persistent["hits"] if persistent else 0)
+        return {
+            "model": self.model_name,
+            "lookups": lookups,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory": memory,
+            "persistent": persistent
+        }
+
+
+def create_persistent_tier() -> Optional[CacheBackend]:
+    """SQLite tier from EMBEDDING_CACHE_* env vars, or None if disabled/unwritable"""
+    if EMBEDDING_CACHE_PERSIST != "sqlite":
+        return None
+    try:
+        return SqliteCacheBackend(
+            EMBEDDING_CACHE_PATH,
+            table="embedding_cache",
+            max_entries=EMBEDDING_CACHE_MAX_ENTRIES
+        )
+    except Exception as e:
+        # e.g. read-only filesystem on Lambda: fall back to memory only
+        logger.warning("Embedding cache persistence disabled: %s", e)
+        return None
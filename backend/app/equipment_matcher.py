@@ -0,0 +1,90 @@
+"""
+Equipment Matcher
+Compiled keyword matcher that maps requested item names to funding categories
+"""
+
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# JSON file with the same shape as FUNDING_LIMITS, replacing the built-in table
+EQUIPMENT_CATEGORIES_PATH = os.getenv("EQUIPMENT_CATEGORIES_PATH")
+
+
+class EquipmentMatcher:
+    """
+    Maps item names to the first category whose keywords appear in them.
+
+    The category table is flattened once into a priority-ordered list of
+    (keyword, category) pairs, so a lookup is one pass of C-level substring
+    checks that stops at the first hit, with the same result as checking
+    every category's keywords in table order. (A single alternation regex
+    was measured slower than this for tables of this size.) Results are
+    memoized since item names repeat heavily across applications.
+    """
+
+    def __init__(self, categories: Dict[str, Dict[str, Any]], memo_size: int = 10000):
+        self.categories = list(categories)
+        self._keywords: List[Tuple[str, str]] = [
+            (keyword.lower(), category)
+            for category, rules in categories.items()
+            for keyword in rules["items"]
+            if keyword
+        ]
+        self._memo: Dict[str, Optional[str]] = {}
+        self._memo_size = memo_size
+
+    def match(self, item_name: Optional[str]) -> Optional[str]:
+        """Category for one item name, or None if no keyword matches"""
+        name = (item_name or "").lower()
+        try:
+            return self._memo[name]
+        except KeyError:
+            pass
+
+        category = None
+        for keyword, candidate in self._keywords:
+            if keyword in name:
+                category = candidate
+                break
+
+        if len(self._memo) < self._memo_size:
+            self._memo[name] = category
+        return category
+
+    def match_many(self, item_names: Iterable[Optional[str]]) -> List[Optional[str]]:
+        """Categories for many item names, preserving order"""
+        match = self.match
+        return [match(name) for name in item_names]
+
+    def match_applications(self, item_lists: Iterable[List[Dict[str, Any]]]) -> List[List[Optional[str]]]:
+        """Categories for each application's requested items (one list per application)"""
+        match = self.match
+        return [[match(item.get("item")) for item in items] for items in item_lists]
+
+
+def load_funding_limits(default: Dict[str, Dict[str, Any]], path: Optional[str] = EQUIPMENT_CATEGORIES_PATH) -> Dict[str, Dict[str, Any]]:
+    """
+    Load the category table from a JSON file, or return the built-in one.
+
+    The file maps category -> {"bswd": limit, "csg": limit, "items": [keywords]};
+    key order is match priority.
+
+    Args:
+        default: Table used when no path is configured
+        path: JSON file path (EQUIPMENT_CATEGORIES_PATH by default)
+
+    Returns:
+        dict: The category table
+    """
+    if not path:
+        return default
+
+    with open(path, encoding="utf-8") as f:
+        categories = json.load(f)
+
+    for category, rules in categories.items():
+        if not isinstance(rules.get("items"), list) or "bswd" not in rules or "csg" not in rules:
+            raise ValueError(f"Equipment category '{category}' in {path} needs 'bswd', 'csg' and an 'items' list")
+
+    return categories
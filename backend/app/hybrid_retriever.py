@@ -0,0 +1,276 @@
+"""
+Hybrid Retriever
+Local BM25 index over the manual chunks, fused with vector search by reciprocal rank, with an optional local reranker
+"""
+
+import json
+import math
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.vectorstores import VectorStore
+
+from pipeline_metrics import record_stage
+
+# Candidates taken from each of the vector and lexical searches before fusion
+RETRIEVAL_FETCH_K = int(os.getenv("RETRIEVAL_FETCH_K", "10"))
+# Reciprocal-rank-fusion constant; larger values flatten the rank differences
+RRF_K = int(os.getenv("RETRIEVAL_RRF_K", "60"))
+# none | lexical
+RETRIEVAL_RERANKER = os.getenv("RETRIEVAL_RERANKER", "none").lower()
+
+# Written by ingest.py: in the shipped corpus directory for Pinecone, next to the local index otherwise
+MANIFEST_FILE = "manifest.json"
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Dollar amounts, numbers ("$2,000" -> "2000") and hyphenated terms ("csg-dse")
+TOKEN_PATTERN = re.compile(r"\$?\d+(?:,\d{3})*(?:\.\d+)?|[a-z0-9]+(?:[-'][a-z0-9]+)*")
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by can do does for from has have how i if in is it its "
+    "me my no not of on or our so than that the their them then there these they this "
+    "to was we what when where which who will with would you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased search terms.
+
+    Numbers lose "$" and thousands separators. Hyphenated terms are kept
+    whole (so "CSG-DSE" matches exactly) and also split into their parts.
+    """
+    terms = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token[0] == "$" or token[0].isdigit():
+            terms.append(token.lstrip("$").replace(",", ""))
+            continue
+        if token in STOPWORDS:
+            continue
+        terms.append(token)
+        if "-" in token:
+            terms.extend(part for part in token.split("-") if part not in STOPWORDS)
+    return terms
+
+
+class LexicalIndex:
+    """
+    In-memory BM25 inverted index.
+
+    Each term maps to the chunks containing it and their precomputed BM25
+    weights, so a query is a handful of NumPy scatter-adds.
+    """
+
+    def __init__(self, documents: Sequence[Document], k1: float = BM25_K1, b: float = BM25_B):
+        self.documents = list(documents)
+        self.idf: Dict[str, float] = {}
+        self._postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+        term_counts = []
+        for doc in self.documents:
+            counts: Dict[str, int] = {}
+            for term in tokenize(doc.page_content):
+                counts[term] = counts.get(term, 0) + 1
+            term_counts.append(counts)
+
+        lengths = np.array([sum(counts.values()) for counts in term_counts], dtype=np.float32)
+        average_length = float(lengths.mean()) if len(lengths) and lengths.mean() > 0 else 1.0
+
+        postings: Dict[str, Tuple[list, list]] = {}
+        for doc_index, counts in enumerate(term_counts):
+            for term, count in counts.items():
+                doc_ids, tfs = postings.setdefault(term, ([], []))
+                doc_ids.append(doc_index)
+                tfs.append(count)
+
+        n = len(self.documents)
+        for term, (doc_ids, tfs) in postings.items():
+            ids = np.array(doc_ids, dtype=np.int32)
+            tf = np.array(tfs, dtype=np.float32)
+            idf = math.log(1 + (n - len(ids) + 0.5) / (len(ids) + 0.5))
+            norm = k1 * (1 - b + b * lengths[ids] / average_length)
+            self.idf[term] = idf
+            self._postings[term] = (ids, (idf * tf * (k1 + 1) / (tf + norm)).astype(np.float32))
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    @classmethod
+    def from_manifest(cls, index_path: str) -> Optional["LexicalIndex"]:
+        """
+        Build the index from the chunks recorded by the last ingestion run.
+
+        Args:
+            index_path: Index directory holding manifest.json
+
+        Returns:
+            LexicalIndex, or None when there is no manifest
+        """
+        manifest_path = os.path.join(index_path, MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            return None
+        with open(manifest_path, encoding="utf-8") as f:
+            chunks = json.load(f).get("chunks", {})
+        return cls([
+            Document(
+                page_content=chunk["text"],
+                metadata={"source": chunk.get("source"), "page": chunk.get("page")},
+                id=chunk_id
+            )
+            for chunk_id, chunk in chunks.items()
+        ])
+
+    @classmethod
+    def from_pinecone(cls, index, batch_size: int = 100) -> "LexicalIndex":
+        """
+        Build the index from the chunk text stored in Pinecone metadata.
+
+        Deployments don't ship the ingestion manifest, so this reads the
+        chunks back from the index itself (ingest.py stores each chunk's
+        text under metadata["text"]). Listing ids needs a serverless index.
+
+        Args:
+            index: A pinecone Index
+            batch_size: Ids fetched per request
+
+        Returns:
+            LexicalIndex over every chunk that has text
+        """
+        documents = []
+        for ids in index.list():
+            ids = list(ids)
+            for i in range(0, len(ids), batch_size):
+                vectors = index.fetch(ids=ids[i:i + batch_size]).vectors
+                for chunk_id, vector in vectors.items():
+                    metadata = dict(vector.metadata or {})
+                    text = metadata.pop("text", None)
+                    if text:
+                        documents.append(Document(page_content=text, metadata=metadata, id=chunk_id))
+        return cls(documents)
+
+    def search(self, query: str, k: int) -> List[Tuple[Document, float]]:
+        """Top-k chunks by BM25 score (only chunks sharing a term with the query)"""
+        if not self.documents:
+            return []
+
+        scores = np.zeros(len(self.documents), dtype=np.float32)
+        for term in set(tokenize(query)):
+            posting = self._postings.get(term)
+            if posting is not None:
+                scores[posting[0]] += posting[1]
+
+        matched = np.flatnonzero(scores)
+        if not len(matched):
+            return []
+        k = min(k, len(matched))
+        top = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        top = top[np.argsort(-scores[top])]
+        return [(self.documents[i], float(scores[i])) for i in top]
+
+
+def reciprocal_rank_fusion(rankings: Iterable[Sequence[Document]], k: int = RRF_K) -> List[Tuple[Document, float]]:
+    """
+    Merge ranked lists: each document scores sum(1 / (k + rank)) over the lists it appears in.
+
+    Documents are matched by id (falling back to their text); the first
+    list a document appears in supplies its metadata.
+    """
+    fused: Dict[str, List] = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, start=1):
+            entry = fused.setdefault(doc.id or doc.page_content, [doc, 0.0])
+            entry[1] += 1.0 / (k + rank)
+    return sorted((tuple(entry) for entry in fused.values()), key=lambda entry: entry[1], reverse=True)
+
+
+class LexicalReranker:
+    """
+    Cheap local reranker: blends the fused score with IDF-weighted query term coverage.
+
+    Rewards chunks that contain all of the rare, exact terms of a question
+    (program names, amounts, defined terms) over chunks that only match
+    part of it.
+    """
+
+    def __init__(self, idf: Dict[str, float], weight: float = 0.5):
+        self.idf = idf
+        self.weight = weight
+
+    def rerank(self, query: str, candidates: Sequence[Tuple[Document, float]]) -> List[Tuple[Document, float]]:
+        terms = set(tokenize(query))
+        total = sum(self.idf.get(term, 0.0) for term in terms)
+        if not candidates or not total:
+            return list(candidates)
+
+        top_score = max(score for _, score in candidates) or 1.0
+        reranked = []
+        for doc, score in candidates:
+            doc_terms = set(tokenize(doc.page_content))
+            coverage = sum(self.idf.get(term, 0.0) for term in terms & doc_terms) / total
+            reranked.append((doc, (1 - self.weight) * score / top_score + self.weight * coverage))
+        return sorted(reranked, key=lambda entry: entry[1], reverse=True)
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    Vector + BM25 retriever with reciprocal-rank fusion.
+
+    Takes `fetch_k` candidates from each search, fuses them, optionally
+    reranks them locally and returns the top `k` with the fused score in
+    metadata["score"]. Until a lexical index is set (e.g. while it is
+    built in the background) results come from the vector search alone.
+    """
+
+    vectorstore: VectorStore
+    lexical_index: Optional[LexicalIndex] = None
+    k: int = 4
+    fetch_k: int = RETRIEVAL_FETCH_K
+    rrf_k: int = RRF_K
+    reranker: Optional[LexicalReranker] = None
+
+    @classmethod
+    def create(cls, vectorstore: VectorStore, lexical_index: Optional[LexicalIndex] = None, k: int = 4) -> "HybridRetriever":
+        """Hybrid retriever configured from the environment (lexical_index may be set later)"""
+        retriever = cls(vectorstore=vectorstore, k=k)
+        if lexical_index is not None:
+            retriever.set_lexical_index(lexical_index)
+        return retriever
+
+    def set_lexical_index(self, lexical_index: LexicalIndex) -> None:
+        """Start fusing with a (newly built) lexical index"""
+        # Reranker first, so a concurrent query never sees the index without it
+        self.reranker = LexicalReranker(lexical_index.idf) if RETRIEVAL_RERANKER == "lexical" else None
+        self.lexical_index = lexical_index
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        vector_documents = self.vectorstore.similarity_search(query, k=self.fetch_k)
+        return self._fuse(query, vector_documents)
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun) -> List[Document]:
+        vector_documents = await self.vectorstore.asimilarity_search(query, k=self.fetch_k)
+        return self._fuse(query, vector_documents)
+
+    def _fuse(self, query: str, vector_documents: List[Document]) -> List[Document]:
+        lexical_index = self.lexical_index
+        if lexical_index is None:
+            return vector_documents[:self.k]
+
+        with record_stage("lexical_search"):
+            lexical_documents = [doc for doc, _ in lexical_index.search(query, self.fetch_k)]
+
+        candidates = reciprocal_rank_fusion([vector_documents, lexical_documents], k=self.rrf_k)
+        if self.reranker is not None:
+            with record_stage("rerank"):
+                candidates = self.reranker.rerank(query, candidates)
+
+        return [
+            Document(page_content=doc.page_content, metadata={**doc.metadata, "score": score}, id=doc.id)
+            for doc, score in candidates[:self.k]
+        ]
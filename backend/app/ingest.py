@@ -0,0 +1,337 @@
+"""
+BSWD Manual Ingestion
+Incremental PDF -> chunks -> embeddings pipeline with change detection
+
+Usage:
+    python app/ingest.py manual.pdf [more.pdf ...] [--index-name bswd-manual]
+
+Each chunk's id is a hash of its source file and text, so re-running after a
+small manual revision only embeds chunks whose text changed. Chunks that are
+no longer in the manual are deleted, and chunks that only moved to another
+page just get their metadata updated.
+
+Changes are detected against the previous run's manifest (for Pinecone,
+backend/corpus/<index>/manifest.json, which is committed). Without one, the
+chunks already stored for the same PDFs are listed from the index instead.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import time
+import urllib.request
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Tuple
+
+from pypdf import PdfReader
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+# Allow `python app/ingest.py` as well as imports from the app directory
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chain import (
+    EMBEDDING_MODEL,
+    VECTORSTORE_BACKEND,
+    get_local_index_path,
+    get_manifest_path,
+    get_pinecone_client,
+)
+from hybrid_retriever import MANIFEST_FILE
+from llm_clients import get_embedding_model
+from local_vectorstore import LocalVectorStore
+
+EMBEDDING_DIMENSION = 1536  # text-embedding-ada-002
+
+
+# CHUNKING
+
+def iter_pdf_chunks(path: str, splitter: RecursiveCharacterTextSplitter) -> Iterator[Tuple[str, str, dict]]:
+    """
+    Stream (chunk_id, text, metadata) from a PDF, one page at a time.
+
+    Args:
+        path: PDF file path
+        splitter: Text splitter used on each page
+
+    Yields:
+        tuple: (chunk_id, text, metadata)
+    """
+    source = os.path.basename(path)
+    reader = PdfReader(path)
+    seen: Dict[str, int] = {}
+
+    for page_number, page in enumerate(reader.pages):
+        text = page.extract_text() or ""
+        for chunk in splitter.split_text(text):
+            digest = hashlib.sha256(f"{source}\x00{chunk}".encode("utf-8")).hexdigest()[:32]
+            # Identical chunks in one file (e.g. repeated headers) get distinct ids
+            occurrence = seen.get(digest, 0)
+            seen[digest] = occurrence + 1
+            chunk_id = f"{source}#{digest}" + (f"-{occurrence}" if occurrence else "")
+
+            yield chunk_id, chunk, {"source": source, "page": page_number}
+
+
+# MANIFEST
+
+def load_manifest(path: str) -> Dict[str, dict]:
+    """Chunks recorded by the previous run ({} if there was none)"""
+    manifest_path = os.path.join(path, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, encoding="utf-8") as f:
+        return json.load(f).get("chunks", {})
+
+def save_manifest(path: str, index_name: str, chunks: Dict[str, dict]) -> None:
+    os.makedirs(path, exist_ok=True)
+    tmp_path = os.path.join(path, MANIFEST_FILE + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "index_name": index_name,
+            "backend": VECTORSTORE_BACKEND,
+            "embedding_model": EMBEDDING_MODEL,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+            "chunks": chunks
+        }, f)
+    os.replace(tmp_path, os.path.join(path, MANIFEST_FILE))
+
+def list_indexed_chunks(index_name: str, index_path: str, sources: List[str], batch_size: int = 100) -> Dict[str, dict]:
+    """
+    Chunks already stored for these source files, read from the vectorstore itself.
+
+    Used when there is no manifest, so removed chunks are still deleted and
+    moved chunks still updated. Chunk ids start with "<source>#", so each
+    source is listed by prefix (Pinecone listing needs a serverless index).
+
+    Returns:
+        dict: {chunk_id: {"source", "page"}}
+    """
+    if VECTORSTORE_BACKEND == "local":
+        if not LocalVectorStore.exists(index_path):
+            return {}
+        documents = LocalVectorStore.load(index_path, get_embedding_model(EMBEDDING_MODEL)).documents()
+        return {
+            doc.id: {"source": doc.metadata.get("source"), "page": doc.metadata.get("page")}
+            for doc in documents
+            if any(doc.id.startswith(f"{source}#") for source in sources)
+        }
+
+    pc = get_pinecone_client()
+    if index_name not in pc.list_indexes().names():
+        return {}
+    index = pc.Index(index_name)
+    ids = [chunk_id for source in sources for page in index.list(prefix=f"{source}#") for chunk_id in page]
+
+    chunks = {}
+    for i in range(0, len(ids), batch_size):
+        for chunk_id, vector in index.fetch(ids=ids[i:i + batch_size]).vectors.items():
+            metadata = vector.metadata or {}
+            chunks[chunk_id] = {"source": metadata.get("source"), "page": metadata.get("page")}
+    return chunks
+
+
+# EMBEDDING
+
+async def embed_in_batches(texts: List[str], batch_size: int, concurrency: int) -> List[List[float]]:
+    """Embed texts in batches with at most `concurrency` requests in flight"""
+    embeddings = get_embedding_model(EMBEDDING_MODEL)
+    semaphore = asyncio.Semaphore(concurrency)
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+
+    async def embed_batch(batch: List[str]) -> List[List[float]]:
+        async with semaphore:
+            return await embeddings.aembed_documents(batch)
+
+    results = await asyncio.gather(*(embed_batch(batch) for batch in batches))
+    return [vector for batch in results for vector in batch]
+
+
+# STORES
+
+class PineconeTarget:
+    """Writes chunk changes to a Pinecone index"""
+
+    def __init__(self, index_name: str):
+        pc = get_pinecone_client()
+        if index_name not in pc.list_indexes().names():
+            from pinecone import ServerlessSpec
+            pc.create_index(
+                name=index_name,
+                dimension=EMBEDDING_DIMENSION,
+                metric="cosine",
+                spec=ServerlessSpec(
+                    cloud=os.getenv("PINECONE_CLOUD", "aws"),
+                    region=os.getenv("PINECONE_REGION", "us-east-1")
+                )
+            )
+        self.index = pc.Index(index_name)
+
+    def upsert(self, ids: List[str], texts: List[str], vectors: List[List[float]], metadatas: List[dict], batch_size: int) -> None:
+        records = [
+            (chunk_id, vector, {**metadata, "text": text})
+            for chunk_id, text, vector, metadata in zip(ids, texts, vectors, metadatas)
+        ]
+        for i in range(0, len(records), batch_size):
+            self.index.upsert(vectors=records[i:i + batch_size])
+
+    def update_metadata(self, chunk_id: str, metadata: dict) -> None:
+        self.index.update(id=chunk_id, set_metadata=metadata)
+
+    def delete(self, ids: List[str]) -> None:
+        for i in range(0, len(ids), 1000):
+            self.index.delete(ids=ids[i:i + 1000])
+
+    def reset(self) -> None:
+        self.index.delete(delete_all=True)
+
+    def commit(self) -> None:
+        pass
+
+
+class LocalTarget:
+    """Writes chunk changes to the on-disk LocalVectorStore"""
+
+    def __init__(self, path: str):
+        self.path = path
+        embeddings = get_embedding_model(EMBEDDING_MODEL)
+        self.store = LocalVectorStore.load(path, embeddings) if LocalVectorStore.exists(path) else LocalVectorStore(embeddings)
+
+    def upsert(self, ids, texts, vectors, metadatas, batch_size) -> None:
+        if ids:
+            self.store.add_embeddings(texts, vectors, metadatas, ids)
+
+    def update_metadata(self, chunk_id: str, metadata: dict) -> None:
+        self.store.update_metadata(chunk_id, metadata)
+
+    def delete(self, ids: List[str]) -> None:
+        self.store.delete(ids)
+
+    def reset(self) -> None:
+        self.store = LocalVectorStore(self.store.embeddings)
+
+    def commit(self) -> None:
+        self.store.save(self.path)
+
+
+# PIPELINE
+
+async def ingest(
+    pdf_paths: List[str],
+    index_name: str,
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200,
+    batch_size: int = 64,
+    concurrency: int = 4,
+    reset: bool = False,
+    dry_run: bool = False
+) -> Dict[str, int]:
+    """
+    Ingest PDFs into the configured vectorstore, embedding only new or changed chunks.
+
+    Args:
+        pdf_paths: Manual PDF files
+        index_name: Pinecone index / local index directory name
+        chunk_size: Characters per chunk
+        chunk_overlap: Characters of overlap between chunks
+        batch_size: Texts per embedding request and vectors per upsert
+        concurrency: Embedding requests in flight at once
+        reset: Delete everything in the index first (e.g. it was built by another tool)
+        dry_run: Report what would change without embedding or writing
+
+    Returns:
+        dict: Chunk counts by outcome
+    """
+    index_path = get_local_index_path(index_name)
+    manifest_path = get_manifest_path(index_name)
+    # Older runs kept the Pinecone manifest next to the (unused) local index
+    previous = {} if reset else (load_manifest(manifest_path) or load_manifest(index_path))
+    if not previous and not reset:
+        previous = list_indexed_chunks(index_name, index_path, [os.path.basename(path) for path in pdf_paths])
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+    current: Dict[str, dict] = {}
+    for pdf_path in pdf_paths:
+        for chunk_id, text, metadata in iter_pdf_chunks(pdf_path, splitter):
+            current[chunk_id] = {**metadata, "text": text}
+
+    new_ids = [chunk_id for chunk_id in current if chunk_id not in previous]
+    moved_ids = [
+        chunk_id for chunk_id in current
+        if chunk_id in previous and previous[chunk_id].get("page") != current[chunk_id]["page"]
+    ]
+    stale_ids = [chunk_id for chunk_id in previous if chunk_id not in current]
+
+    summary = {
+        "chunks": len(current),
+        "new": len(new_ids),
+        "unchanged": len(current) - len(new_ids) - len(moved_ids),
+        "metadata_updated": len(moved_ids),
+        "deleted": len(stale_ids),
+        "embedding_requests": -(-len(new_ids) // batch_size),
+    }
+    if dry_run:
+        return summary
+
+    target = LocalTarget(index_path) if VECTORSTORE_BACKEND == "local" else PineconeTarget(index_name)
+    if reset:
+        target.reset()
+
+    texts = [current[chunk_id]["text"] for chunk_id in new_ids]
+    metadatas = [{"source": current[i]["source"], "page": current[i]["page"]} for i in new_ids]
+    vectors = await embed_in_batches(texts, batch_size, concurrency) if texts else []
+    await asyncio.to_thread(target.upsert, new_ids, texts, vectors, metadatas, batch_size)
+
+    for chunk_id in moved_ids:
+        target.update_metadata(chunk_id, {"page": current[chunk_id]["page"]})
+    if stale_ids:
+        target.delete(stale_ids)
+
+    target.commit()
+    save_manifest(manifest_path, index_name, current)
+    return summary
+
+
+def reload_backend_chain(api_url: str) -> None:
+    """Tell a running backend to reload its chain (this also drops cached chatbot answers)"""
+    request = urllib.request.Request(f"{api_url.rstrip('/')}/api/chat/reload", method="POST")
+    with urllib.request.urlopen(request, timeout=60) as response:
+        print(f"Backend chain reloaded ({response.status})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest BSWD manual PDFs into the vectorstore")
+    parser.add_argument("pdfs", nargs="+", help="PDF files to ingest")
+    parser.add_argument("--index-name", default=os.getenv("PINECONE_INDEX_NAME", "bswd-manual"))
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--reset", action="store_true", help="Delete all existing vectors first")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would change")
+    parser.add_argument("--api-url", help="Backend URL whose chain should be reloaded afterwards")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    summary = asyncio.run(ingest(
+        args.pdfs,
+        args.index_name,
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        reset=args.reset,
+        dry_run=args.dry_run
+    ))
+    print(json.dumps(summary, indent=2))
+    print(f"{'Dry run' if args.dry_run else 'Ingestion'} finished in {time.perf_counter() - start:.1f}s")
+
+    # Moved chunks count too: their page metadata (shown as sources) changed
+    if args.api_url and not args.dry_run and (summary["new"] or summary["deleted"] or summary["metadata_updated"]):
+        reload_backend_chain(args.api_url)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+LLM Client Registry
+Shared, connection-pooled OpenAI clients reused across requests
+"""
+
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+import httpx
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+
+DEFAULT_CHAT_MODEL = "gpt-4-turbo-preview"
+DEFAULT_EMBEDDING_MODEL = "text-embedding-ada-002"
+
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+LLM_CONNECT_TIMEOUT_SECONDS = float(os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", "10"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+
+_lock = threading.Lock()
+_http_client: Optional[httpx.Client] = None
+_http_async_client: Optional[httpx.AsyncClient] = None
+_chat_models: Dict[Tuple[str, float], ChatOpenAI] = {}
+_embedding_models: Dict[str, OpenAIEmbeddings] = {}
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(LLM_TIMEOUT_SECONDS, connect=LLM_CONNECT_TIMEOUT_SECONDS)
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS
+    )
+
+
+def get_http_clients() -> Tuple[httpx.Client, httpx.AsyncClient]:
+    """
+    Get the shared sync and async HTTP clients, creating them on first use.
+
+    Every model built by this registry shares these clients, so TLS
+    connections are pooled and kept alive across requests.
+
+    Returns:
+        tuple: (http_client, http_async_client)
+    """
+    global _http_client, _http_async_client
+
+    with _lock:
+        if _http_client is None or _http_client.is_closed:
+            _http_client = httpx.Client(timeout=_timeout(), limits=_limits())
+        if _http_async_client is None or _http_async_client.is_closed:
+            _http_async_client = httpx.AsyncClient(timeout=_timeout(), limits=_limits())
+        return _http_client, _http_async_client
+
+
+def get_chat_model(model: str = DEFAULT_CHAT_MODEL, temperature: float = 0.7) -> ChatOpenAI:
+    """
+    Get a shared ChatOpenAI instance for a model/temperature pair.
+
+    Args:
+        model: OpenAI chat model name
+        temperature: Sampling temperature
+
+    Returns:
+        ChatOpenAI: Cached chat model using the pooled HTTP clients
+    """
+    key = (model, temperature)
+    llm = _chat_models.get(key)
+    if llm is not None:
+        return llm
+
+    http_client, http_async_client = get_http_clients()
+    with _lock:
+        if key not in _chat_models:
+            _chat_models[key] = ChatOpenAI(
+                model=model,
+                temperature=temperature,
+                # Report token usage on streamed responses too (for /metrics)
+                stream_usage=True,
+                openai_api_key=os.getenv("OPENAI_API_KEY"),
+                timeout=_timeout(),
+                max_retries=LLM_MAX_RETRIES,
+                http_client=http_client,
+                http_async_client=http_async_client
+            )
+        return _chat_models[key]
+
+
+def get_embedding_model(model: str = DEFAULT_EMBEDDING_MODEL) -> OpenAIEmbeddings:
+    """
+    Get a shared OpenAIEmbeddings instance for a model.
+
+    Args:
+        model: OpenAI embedding model name
+
+    Returns:
+        OpenAIEmbeddings: Cached embeddings model using the pooled HTTP clients
+    """
+    embeddings = _embedding_models.get(model)
+    if embeddings is not None:
+        return embeddings
+
+    http_client, http_async_client = get_http_clients()
+    with _lock:
+        if model not in _embedding_models:
+            _embedding_models[model] = OpenAIEmbeddings(
+                model=model,
+                openai_api_key=os.getenv("OPENAI_API_KEY"),
+                timeout=_timeout(),
+                max_retries=LLM_MAX_RETRIES,
+                http_client=http_client,
+                http_async_client=http_async_client
+            )
+        return _embedding_models[model]
+
+
+async def aclose_clients() -> None:
+    """Close the pooled HTTP clients and drop cached models (called on shutdown)"""
+    global _http_client, _http_async_client
+
+    with _lock:
+        http_client, http_async_client = _http_client, _http_async_client
+        _http_client = _http_async_client = None
+        _chat_models.clear()
+        _embedding_models.clear()
+
+    if http_client is not None:
+        http_client.close()
+    if http_async_client is not None:
+        await http_async_client.aclose()
@@ -0,0 +1,231 @@
+"""
+Local Vectorstore
+In-process exact vector index for the BSWD manual, loaded from a memory-mapped embeddings file
+"""
+
+import json
+import os
+import uuid
+from typing import Any, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+EMBEDDINGS_FILE = "embeddings.npy"
+DOCUMENTS_FILE = "documents.jsonl"
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class LocalVectorStore(VectorStore):
+    """
+    Exact cosine-similarity search over a NumPy matrix.
+
+    The index directory holds `embeddings.npy` (float32, one unit-length
+    row per chunk) and `documents.jsonl` ({"id", "text", "metadata"} per
+    line, same order). The matrix is memory-mapped on load, so startup is
+    instant and pages are shared between worker processes. The manual is
+    small enough that a brute-force dot product is sub-millisecond.
+    """
+
+    def __init__(
+        self,
+        embedding: Embeddings,
+        vectors: Optional[np.ndarray] = None,
+        ids: Optional[List[str]] = None,
+        texts: Optional[List[str]] = None,
+        metadatas: Optional[List[dict]] = None
+    ):
+        self._embedding = embedding
+        self._vectors = vectors
+        self._ids = ids or []
+        self._texts = texts or []
+        self._metadatas = metadatas or []
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    @property
+    def ids(self) -> List[str]:
+        return list(self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def documents(self) -> List[Document]:
+        """Every stored chunk, in index order"""
+        return [
+            Document(page_content=text, metadata=dict(metadata), id=doc_id)
+            for doc_id, text, metadata in zip(self._ids, self._texts, self._metadatas)
+        ]
+
+    # Persistence
+
+    @classmethod
+    def exists(cls, path: str) -> bool:
+        return os.path.exists(os.path.join(path, EMBEDDINGS_FILE)) and os.path.exists(os.path.join(path, DOCUMENTS_FILE))
+
+    @classmethod
+    def load(cls, path: str, embedding: Embeddings) -> "LocalVectorStore":
+        """
+        Load an index directory written by save().
+
+        Args:
+            path: Index directory
+            embedding: Embeddings used to embed queries (must match the stored vectors)
+
+        Returns:
+            LocalVectorStore: The loaded store
+        """
+        vectors = np.load(os.path.join(path, EMBEDDINGS_FILE), mmap_mode="r")
+        ids, texts, metadatas = [], [], []
+        with open(os.path.join(path, DOCUMENTS_FILE), encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                ids.append(record["id"])
+                texts.append(record["text"])
+                metadatas.append(record.get("metadata", {}))
+
+        if len(ids) != vectors.shape[0]:
+            raise ValueError(f"Local index at '{path}' is inconsistent: {len(ids)} documents, {vectors.shape[0]} vectors")
+
+        return cls(embedding, vectors, ids, texts, metadatas)
+
+    def save(self, path: str) -> None:
+        """Write the index directory atomically (temp files, then rename)"""
+        os.makedirs(path, exist_ok=True)
+        vectors = self._vectors if self._vectors is not None else np.zeros((0, 0), dtype=np.float32)
+
+        tmp_vectors = os.path.join(path, EMBEDDINGS_FILE + ".tmp")
+        with open(tmp_vectors, "wb") as f:
+            np.save(f, np.ascontiguousarray(vectors, dtype=np.float32))
+
+        tmp_documents = os.path.join(path, DOCUMENTS_FILE + ".tmp")
+        with open(tmp_documents, "w", encoding="utf-8") as f:
+            for doc_id, text, metadata in zip(self._ids, self._texts, self._metadatas):
+                f.write(json.dumps({"id": doc_id, "text": text, "metadata": metadata}) + "\n")
+
+        os.replace(tmp_vectors, os.path.join(path, EMBEDDINGS_FILE))
+        os.replace(tmp_documents, os.path.join(path, DOCUMENTS_FILE))
+
+    # Writes
+
+    def add_embeddings(
+        self,
+        texts: List[str],
+        vectors: List[List[float]],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None
+    ) -> List[str]:
+        """Add pre-computed embeddings (replacing any existing entries with the same ids)"""
+        ids = ids or [str(uuid.uuid4()) for _ in texts]
+        metadatas = metadatas or [{} for _ in texts]
+        self.delete(ids)
+
+        new_vectors = _normalize_rows(np.asarray(vectors, dtype=np.float32))
+        if self._vectors is None or len(self._ids) == 0:
+            self._vectors = new_vectors
+        else:
+            self._vectors = np.vstack([np.asarray(self._vectors), new_vectors])
+
+        self._ids.extend(ids)
+        self._texts.extend(texts)
+        self._metadatas.extend(metadatas)
+        return ids
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        *,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any
+    ) -> List[str]:
+        texts = list(texts)
+        return self.add_embeddings(texts, self._embedding.embed_documents(texts), metadatas, ids)
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        if not ids or not self._ids:
+            return True
+        removed = set(ids)
+        keep = [i for i, doc_id in enumerate(self._ids) if doc_id not in removed]
+        if len(keep) == len(self._ids):
+            return True
+
+        self._vectors = np.asarray(self._vectors)[keep]
+        self._ids = [self._ids[i] for i in keep]
+        self._texts = [self._texts[i] for i in keep]
+        self._metadatas = [self._metadatas[i] for i in keep]
+        return True
+
+    def update_metadata(self, doc_id: str, metadata: dict) -> None:
+        """Merge new metadata into an existing entry without re-embedding it"""
+        index = self._ids.index(doc_id)
+        self._metadatas[index] = {**self._metadatas[index], **metadata}
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        *,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any
+    ) -> "LocalVectorStore":
+        store = cls(embedding)
+        store.add_texts(texts, metadatas, ids=ids)
+        return store
+
+    # Search
+
+    def similarity_search_by_vector_with_score(self, vector: List[float], k: int = 4) -> List[Tuple[Document, float]]:
+        """Top-k documents by cosine similarity to an embedding"""
+        if not self._ids:
+            return []
+
+        query = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+
+        scores = self._vectors @ query
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return [
+            (
+                Document(page_content=self._texts[i], metadata=dict(self._metadatas[i]), id=self._ids[i]),
+                float(scores[i])
+            )
+            for i in top
+        ]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.similarity_search_by_vector_with_score(self._embedding.embed_query(query), k)
+
+    async def asimilarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.similarity_search_by_vector_with_score(await self._embedding.aembed_query(query), k)
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+    async def asimilarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in await self.asimilarity_search_with_score(query, k)]
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_by_vector_with_score(embedding, k)]
+
+    def _select_relevance_score_fn(self):
+        # Cosine similarity in [-1, 1] -> relevance in [0, 1]
+        return lambda score: (score + 1.0) / 2.0
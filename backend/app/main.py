@@ -3,36 +3,63 @@ FastAPI Backend for BSWD Chatbot
 Integrates with LangChain RAG system and Pinecone
 """
 
+import time
+_import_start = time.perf_counter()
+
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Literal, Optional
 from contextlib import asynccontextmanager
 import sys
 import os
+import anyio
 from mangum import Mangum
 
 # Add the app directory to the path so we can import chain
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from chain import get_or_create_chain, chat_with_memory, chat_with_memory_stream
+from startup_timing import record_since, timing_report
+from app_logging import RequestLoggingMiddleware, get_logger
+from background_jobs import background_jobs_supported
+from pipeline_metrics import RouteTagMiddleware, metrics
+from token_counter import preload_encoder
+
+# The LangChain stack (chain, llm_clients) is imported inside the chat routes,
+# so cold starts that only serve deterministic routes never load it.
 from analysis_routes import router as analysis_router
 from admin_routes import router as admin_router
 
+logger = get_logger("main")
+
+# Token counts use the length estimate until the tiktoken encoding is loaded.
+# Started at import so it also runs on Lambda, where the lifespan is off.
+preload_encoder()
+
+# Build the chain during startup (uvicorn) instead of on the first chat request
+CHAIN_WARM_START = os.getenv("CHAIN_WARM_START", "true").lower() == "true"
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialize the conversation chain on startup"""
-    try:
-        print("Initializing chatbot chain...")
-        chain, memory = get_or_create_chain()
-        print("Chatbot chain initialized successfully!")
-    except Exception as e:
-        print(f"Error initializing chain: {str(e)}")
-        raise
+    """Optionally warm the conversation chain on startup and close pooled clients on shutdown"""
+    if CHAIN_WARM_START:
+        try:
+            logger.info("Initializing chatbot chain...")
+            from chain import aget_or_create_chain
+            chain, memory_store = await aget_or_create_chain()
+            logger.info("Chatbot chain initialized successfully!")
+        except Exception:
+            logger.exception("Error initializing chain")
+            raise
     
     yield  # Application runs here
 
+    # Only close clients if a route actually created them
+    llm_clients = sys.modules.get("llm_clients")
+    if llm_clients is not None:
+        await llm_clients.aclose_clients()
+
 app = FastAPI(
     title="BSWD Chatbot API",
     description="Backend API for BSWD Manual Chatbot with RAG",
@@ -48,6 +75,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(RouteTagMiddleware)
+app.add_middleware(RequestLoggingMiddleware)
 
 
 # Request/Response Models
@@ -59,6 +88,10 @@ class ChatMessage(BaseModel):
 class ChatRequest(BaseModel):
     message: str
     history: Optional[List[ChatMessage]] = []
+    session_id: Optional[str] = None
+    # Streaming options (only used by /api/chat-stream)
+    stream_format: Literal["text", "sse"] = "text"
+    include_sources: bool = False
 
 
 class ChatResponse(BaseModel):
@@ -76,19 +109,43 @@ async def root():
     }
 
 
+@app.get("/health/startup")
+async def startup_report():
+    """Cold-start timing report (milliseconds per initialization phase)"""
+    return {
+        "chain_loaded": "chain" in sys.modules and sys.modules["chain"].is_chain_loaded(),
+        "timings_ms": timing_report()
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Per-stage pipeline latency histograms and LLM token counters (Prometheus text format)"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/health")
 async def health_check():
     """Detailed health check"""
+    # Optional features the frontend may switch on
+    capabilities = {"background_reasoning": background_jobs_supported()}
     try:
-        chain, memory = get_or_create_chain()
+        from chain import aget_or_create_chain, aget_admin_chain
+        chain, memory_store = await aget_or_create_chain()
+        admin_chain, admin_memory_store = await aget_admin_chain()
         return {
             "status": "healthy",
-            "chain_loaded": chain is not None,
-            "memory_loaded": memory is not None
+            "capabilities": capabilities,
+            "chain_loaded": chain is not None and admin_chain is not None,
+            "memory_loaded": memory_store is not None and admin_memory_store is not None,
+            "memory_mode": memory_store.mode,
+            "active_sessions": len(memory_store),
+            "admin_active_sessions": len(admin_memory_store)
         }
     except Exception as e:
         return {
             "status": "unhealthy",
+            "capabilities": capabilities,
             "error": str(e)
         }
 
@@ -101,11 +158,14 @@ async def chat(request: ChatRequest):
     Processes user messages and returns AI responses using RAG
     """
     try:
-        # Get the conversation chain and memory
-        chain, memory = get_or_create_chain()
+        from chain import aget_or_create_chain, get_answer_cache, achat_with_memory
+
+        # Get the conversation chain and this session's memory
+        chain, memory_store = await aget_or_create_chain()
+        memory = memory_store.for_request(request.session_id, request.history)
         
         # Get response from chatbot
-        response = chat_with_memory(chain, memory, request.message)
+        response = await achat_with_memory(chain, memory, request.message, answer_cache=get_answer_cache())
         
         # Format source documents - implement sources most likely on admin side later
         source_docs = []
@@ -124,7 +184,7 @@ async def chat(request: ChatRequest):
         )
         
     except Exception as e:
-        print(f"Error processing chat: {str(e)}")
+        logger.exception("Error processing chat")
         raise HTTPException(
             status_code=500,
             detail=f"Error processing your message: {str(e)}"
@@ -136,23 +196,37 @@ async def chat(request: ChatRequest):
     Main chat endpoint for STUDENT chatbot stream
     """
     try:
-        chain, memory = get_or_create_chain()
-        return StreamingResponse(chat_with_memory_stream(chain, memory, request.message), media_type="text/plain; charset=utf-8")
+        from chain import aget_or_create_chain, get_answer_cache, achat_with_memory_stream
+
+        chain, memory_store = await aget_or_create_chain()
+        memory = memory_store.for_request(request.session_id, request.history)
+        sse = request.stream_format == "sse"
+        return StreamingResponse(
+            achat_with_memory_stream(
+                chain, memory, request.message,
+                sse=sse,
+                include_sources=request.include_sources,
+                answer_cache=get_answer_cache()
+            ),
+            media_type="text/event-stream" if sse else "text/plain; charset=utf-8"
+        )
 
         
     except Exception as e:
-        print(f"Error processing chat: {str(e)}")
+        logger.exception("Error processing chat")
         raise HTTPException(
             status_code=500,
             detail=f"Error processing your message: {str(e)}"
         )
 
 @app.post("/api/chat/reset")
-async def reset_conversation():
-    """Reset the conversation memory"""
+async def reset_conversation(session_id: Optional[str] = None):
+    """Reset the conversation memory (student and admin chatbots) for one session, or all sessions"""
     try:
-        chain, memory = get_or_create_chain()
-        memory.clear()
+        from chain import aget_or_create_chain, aget_admin_chain
+
+        for _, memory_store in (await aget_or_create_chain(), await aget_admin_chain()):
+            memory_store.clear(session_id)
         return {"status": "success", "message": "Conversation history cleared"}
     except Exception as e:
         raise HTTPException(
@@ -160,12 +234,53 @@ async def reset_conversation():
             detail=f"Error resetting conversation: {str(e)}"
         )
         
+@app.post("/api/chat/reload")
+async def reload_conversation_chain():
+    """Rebuild the chain against the current index and swap it in without downtime"""
+    try:
+        from chain import reload_chain
+        await anyio.to_thread.run_sync(reload_chain)
+        return {"status": "success", "message": "Chatbot chain reloaded"}
+    except Exception as e:
+        logger.exception("Error reloading chain")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error reloading chain: {str(e)}"
+        )
+
+@app.get("/api/chat/cache/stats")
+async def answer_cache_stats():
+    """Hit/miss counters for the semantic answer cache"""
+    from chain import get_answer_cache
+    answer_cache = get_answer_cache()
+    return answer_cache.stats() if answer_cache else {"enabled": False}
+
+
+@app.post("/api/chat/cache/invalidate")
+async def invalidate_answer_cache():
+    """Drop all cached answers (call after re-ingesting the manual)"""
+    from chain import get_answer_cache
+    answer_cache = get_answer_cache()
+    if answer_cache:
+        answer_cache.invalidate()
+    return {"status": "success", "message": "Answer cache cleared"}
+
+@app.get("/api/embeddings/cache/stats")
+async def embedding_cache_stats():
+    """Hit rates for the query embedding cache"""
+    from chain import get_embeddings
+    return await get_embeddings().astats()
+
 app.include_router(analysis_router)
 app.include_router(admin_router)
 
+record_since("import_app", _import_start)
+
 
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
 
-handler = Mangum(app)
\ No newline at end of file
+# Mangum runs lifespan startup/shutdown on every invocation, which would close
+# the pooled LLM clients each time; warm containers should keep them open.
+handler = Mangum(app, lifespan="off")
\ No newline at end of file
@@ -0,0 +1,231 @@
+"""
+Session Memory Store
+Per-session conversation memory with bounded windows and idle-session eviction,
+or stateless memory built from the history the client sends with each request
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from langchain.memory import ConversationBufferWindowMemory
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+
+from token_counter import TOKENS_PER_MESSAGE, count_message_tokens, truncate_to_tokens
+
+DEFAULT_SESSION_ID = "default"
+
+MAX_TURNS = int(os.getenv("CHAT_MEMORY_MAX_TURNS", "6"))
+MAX_MESSAGE_CHARS = int(os.getenv("CHAT_MEMORY_MAX_MESSAGE_CHARS", "4000"))
+SESSION_TTL_SECONDS = float(os.getenv("CHAT_MEMORY_TTL_SECONDS", "1800"))
+MAX_SESSIONS = int(os.getenv("CHAT_MEMORY_MAX_SESSIONS", "1000"))
+# server: history lives in this process, keyed by session id
+# client: history comes from the request, nothing is kept between calls
+CHAT_MEMORY_MODE = os.getenv("CHAT_MEMORY_MODE", "server").lower()
+# Token budget for client-supplied history
+MAX_HISTORY_TOKENS = int(os.getenv("CHAT_HISTORY_MAX_TOKENS", "1500"))
+
+_ROLE_MESSAGES = {"user": HumanMessage, "human": HumanMessage, "assistant": AIMessage, "ai": AIMessage}
+
+
+class BoundedWindowMemory(ConversationBufferWindowMemory):
+    """
+    Window memory that also prunes the underlying buffer.
+
+    ConversationBufferWindowMemory only applies its window when loading, so
+    the stored message list still grows forever. This keeps at most `k` turns
+    and truncates each message to `max_message_chars`.
+    """
+    max_message_chars: int = MAX_MESSAGE_CHARS
+
+    def save_context(self, inputs: Dict[str, Any], outputs: Dict[str, str]) -> None:
+        inputs = {key: self._truncate(value) for key, value in inputs.items()}
+        outputs = {key: self._truncate(value) for key, value in outputs.items()}
+        super().save_context(inputs, outputs)
+
+        messages = self.chat_memory.messages
+        if len(messages) > self.k * 2:
+            self.chat_memory.messages = messages[-self.k * 2:]
+
+    def _truncate(self, value: Any) -> Any:
+        if isinstance(value, str) and len(value) > self.max_message_chars:
+            return value[:self.max_message_chars]
+        return value
+
+
+def history_to_messages(
+    history: Optional[List[Any]],
+    max_turns: int = MAX_TURNS,
+    max_tokens: int = MAX_HISTORY_TOKENS,
+    max_message_chars: int = MAX_MESSAGE_CHARS
+) -> List[BaseMessage]:
+    """
+    Convert client-supplied history into chat messages that fit the budget.
+
+    Keeps the most recent `max_turns` turns, truncates each message to
+    `max_message_chars`, then drops the oldest messages until the rest fit
+    in `max_tokens`. Unknown roles (e.g. "system") are ignored and a leading
+    assistant message (such as a welcome greeting) is dropped so the
+    history always starts with the user.
+
+    Args:
+        history: Items with `role` and `content`, as objects or dicts
+        max_turns: Maximum number of question/answer turns to keep
+        max_tokens: Token budget for the whole history
+        max_message_chars: Maximum characters kept from each message
+
+    Returns:
+        List[BaseMessage]: Oldest-first messages for the "chat_history" prompt slot
+    """
+    messages = []
+    for item in history or []:
+        role = item.get("role") if isinstance(item, dict) else getattr(item, "role", None)
+        content = item.get("content") if isinstance(item, dict) else getattr(item, "content", None)
+        message_class = _ROLE_MESSAGES.get(str(role).lower())
+        if message_class is None or not content:
+            continue
+        messages.append(message_class(content=str(content)[:max_message_chars]))
+
+    messages = messages[-max_turns * 2:] if max_turns > 0 else []
+
+    while messages and count_message_tokens(messages) > max_tokens:
+        if len(messages) == 1:
+            # A single oversized message is cut down rather than dropped
+            message = messages[0]
+            messages = [message.__class__(content=truncate_to_tokens(message.content, max_tokens - TOKENS_PER_MESSAGE))]
+            break
+        messages.pop(0)
+
+    while messages and not isinstance(messages[0], HumanMessage):
+        messages.pop(0)
+
+    return [message for message in messages if message.content]
+
+
+class ClientHistoryMemory:
+    """
+    Stateless stand-in for BoundedWindowMemory.
+
+    Loads the history the client sent with the request and saves nothing,
+    so any worker can serve any turn without sticky sessions.
+    """
+
+    def __init__(self, messages: List[BaseMessage]):
+        self.messages = messages
+
+    def load_memory_variables(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        return {"chat_history": list(self.messages)}
+
+    def save_context(self, inputs: Dict[str, Any], outputs: Dict[str, str]) -> None:
+        # The client owns the history and sends the new turn back next time
+        pass
+
+
+class SessionMemoryStore:
+    """
+    Thread-safe map of session id -> conversation memory.
+
+    Sessions are kept in LRU order. Idle sessions expire after `ttl_seconds`
+    and the least recently used session is evicted once `max_sessions` is
+    reached, so total memory is bounded by
+    max_sessions * max_turns * 2 * max_message_chars characters.
+    """
+
+    def __init__(
+        self,
+        max_turns: int = MAX_TURNS,
+        ttl_seconds: float = SESSION_TTL_SECONDS,
+        max_sessions: int = MAX_SESSIONS,
+        max_message_chars: int = MAX_MESSAGE_CHARS,
+        mode: str = CHAT_MEMORY_MODE,
+        max_history_tokens: int = MAX_HISTORY_TOKENS
+    ):
+        self.max_turns = max_turns
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.max_message_chars = max_message_chars
+        self.mode = mode
+        self.max_history_tokens = max_history_tokens
+        self._sessions: "OrderedDict[str, tuple[BoundedWindowMemory, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: Optional[str] = None) -> BoundedWindowMemory:
+        """
+        Get the memory for a session, creating it if needed.
+
+        Args:
+            session_id: Client-supplied session id (falls back to a shared default)
+
+        Returns:
+            BoundedWindowMemory: The memory instance for this session
+        """
+        session_id = session_id or DEFAULT_SESSION_ID
+        now = time.monotonic()
+
+        with self._lock:
+            self._evict_expired(now)
+
+            entry = self._sessions.pop(session_id, None)
+            memory = entry[0] if entry else self._new_memory()
+            self._sessions[session_id] = (memory, now)
+
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+            return memory
+
+    def for_request(self, session_id: Optional[str] = None, history: Optional[List[Any]] = None):
+        """
+        Get the memory to use for one request.
+
+        In "client" mode this is a ClientHistoryMemory built from the
+        request's trimmed, token-budgeted history and nothing is stored on
+        the server; in "server" mode it is the session's stored memory and
+        `history` is ignored.
+
+        Args:
+            session_id: Client-supplied session id
+            history: Prior messages sent with the request (role/content)
+
+        Returns:
+            A memory object with load_memory_variables and save_context
+        """
+        if self.mode == "client":
+            return ClientHistoryMemory(history_to_messages(
+                history,
+                max_turns=self.max_turns,
+                max_tokens=self.max_history_tokens,
+                max_message_chars=self.max_message_chars
+            ))
+        return self.get(session_id)
+
+    def clear(self, session_id: Optional[str] = None) -> None:
+        """Drop one session, or every session when no id is given"""
+        with self._lock:
+            if session_id is None:
+                self._sessions.clear()
+            else:
+                self._sessions.pop(session_id, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def _new_memory(self) -> BoundedWindowMemory:
+        return BoundedWindowMemory(
+            k=self.max_turns,
+            max_message_chars=self.max_message_chars,
+            memory_key="chat_history",
+            return_messages=True,
+            output_key="answer"
+        )
+
+    def _evict_expired(self, now: float) -> None:
+        # OrderedDict is in access order, so expired sessions are at the front
+        while self._sessions:
+            session_id, (_, last_access) = next(iter(self._sessions.items()))
+            if now - last_access < self.ttl_seconds:
+                break
+            del self._sessions[session_id]
@@ -0,0 +1,97 @@
+"""
+Metrics Callbacks
+LangChain callback handler that feeds pipeline stage timings and token counts into pipeline_metrics
+"""
+
+import time
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from pipeline_metrics import metrics
+
+
+class StageTimingHandler(BaseCallbackHandler):
+    """
+    Times LLM calls and retrievals inside a chain.
+
+    LLM runs are recorded under their run name (e.g. "rewrite_question",
+    "answer", "analysis"), retrievals as "retrieval" and the outermost
+    chain run as "chain". Token usage is taken from the message's
+    usage_metadata, falling back to the provider's llm_output.
+    """
+
+    # Called inline (not in an executor) so the route context variable is visible
+    run_inline = True
+
+    def __init__(self):
+        self._runs: Dict[UUID, tuple] = {}
+
+    def _start(self, run_id: UUID, stage: str, model: Optional[str] = None) -> None:
+        self._runs[run_id] = (stage, model, time.perf_counter())
+
+    def _end(self, run_id: UUID) -> Optional[tuple]:
+        run = self._runs.pop(run_id, None)
+        if run is not None:
+            stage, model, start = run
+            metrics.observe(stage, time.perf_counter() - start)
+        return run
+
+    # LLMs
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, metadata: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        model = (metadata or {}).get("ls_model_name") or kwargs.get("invocation_params", {}).get("model_name", "unknown")
+        self._start(run_id, kwargs.get("name") or "llm", model)
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, metadata: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        model = (metadata or {}).get("ls_model_name", "unknown")
+        self._start(run_id, kwargs.get("name") or "llm", model)
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any) -> None:
+        run = self._end(run_id)
+        if run is None:
+            return
+
+        prompt_tokens = completion_tokens = 0
+        usage = None
+        generations = response.generations[0] if response.generations else []
+        message = getattr(generations[0], "message", None) if generations else None
+        if message is not None and getattr(message, "usage_metadata", None):
+            usage = message.usage_metadata
+            prompt_tokens, completion_tokens = usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+        elif response.llm_output and response.llm_output.get("token_usage"):
+            usage = response.llm_output["token_usage"]
+            prompt_tokens, completion_tokens = usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+
+        if usage is not None:
+            metrics.add_tokens(run[1] or "unknown", prompt_tokens, completion_tokens)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    # Retrieval
+
+    def on_retriever_start(self, serialized, query: str, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id, "retrieval")
+
+    def on_retriever_end(self, documents, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_retriever_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    # Whole chain
+
+    def on_chain_start(self, serialized, inputs, *, run_id: UUID, parent_run_id: Optional[UUID] = None, **kwargs: Any) -> None:
+        if parent_run_id is None:
+            self._start(run_id, "chain")
+
+    def on_chain_end(self, outputs, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+
+stage_timing_handler = StageTimingHandler()
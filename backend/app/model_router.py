@@ -0,0 +1,75 @@
+"""
+Model Router
+Picks the chat model for each LLM call site, and for chat answers by question complexity
+"""
+
+import os
+import re
+
+# Model tiers; routes name a tier or an explicit model
+MODEL_TIERS = {
+    "small": os.getenv("LLM_SMALL_MODEL", "gpt-4o-mini"),
+    "large": os.getenv("LLM_LARGE_MODEL", "gpt-4-turbo-preview"),
+}
+
+# Route per call site: "small", "large", "auto" (by question complexity) or a model name.
+# Override with LLM_ROUTE_<CALL_SITE>, e.g. LLM_ROUTE_ANSWER=large
+DEFAULT_ROUTES = {
+    # Standalone-question rewrite of follow-ups
+    "rewrite": "small",
+    # Student chatbot answer
+    "answer": "auto",
+    # Admin chatbot answer (policy reasoning about a specific application)
+    "admin_answer": "large",
+    # 2-3 sentence summary of already computed analysis numbers
+    "analysis": "small",
+}
+MODEL_ROUTES = {site: os.getenv(f"LLM_ROUTE_{site.upper()}", route).strip() for site, route in DEFAULT_ROUTES.items()}
+
+# Questions longer than this (in words) go to the large model under "auto"
+COMPLEX_QUESTION_WORDS = int(os.getenv("LLM_COMPLEX_QUESTION_WORDS", "25"))
+
+# Comparisons, multi-part questions, calculations and what-ifs need the large model
+COMPLEX_PATTERN = re.compile(
+    r"\b(compare|comparison|difference|differ|versus|vs|why|explain|calculate|combined|"
+    r"both|either|whether|if|unless|except|exception|appeal|scenario|step[- ]by[- ]step)\b|\$\s?\d",
+    re.IGNORECASE
+)
+
+
+def classify_question(question: str) -> str:
+    """
+    Rough complexity of a chat question.
+
+    Args:
+        question: The user's question
+
+    Returns:
+        str: "complex" for long, multi-part, comparative or numeric questions, else "simple"
+    """
+    question = question or ""
+    if len(question.split()) > COMPLEX_QUESTION_WORDS or question.count("?") > 1:
+        return "complex"
+    return "complex" if COMPLEX_PATTERN.search(question) else "simple"
+
+
+def is_auto_routed(call_site: str) -> bool:
+    """Whether a call site picks its model per question"""
+    return MODEL_ROUTES[call_site] == "auto"
+
+
+def model_for(call_site: str, complexity: str = "complex") -> str:
+    """
+    Model name to use at a call site.
+
+    Args:
+        call_site: One of DEFAULT_ROUTES ("rewrite", "answer", "admin_answer", "analysis")
+        complexity: "simple" or "complex"; only used by "auto" routes
+
+    Returns:
+        str: OpenAI chat model name
+    """
+    route = MODEL_ROUTES[call_site]
+    if route == "auto":
+        route = "large" if complexity == "complex" else "small"
+    return MODEL_TIERS.get(route, route)
@@ -0,0 +1,129 @@
+"""
+Pipeline Metrics
+Per-stage latency histograms and LLM token counters, tagged by route, in Prometheus text format
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional, Tuple
+
+from app_logging import get_logger
+
+logger = get_logger("metrics")
+
+# Also log one structured line per recorded stage (off by default)
+METRICS_LOG_STAGES = os.getenv("METRICS_LOG_STAGES", "false").lower() == "true"
+
+# Upper bounds (seconds) of the latency histogram buckets
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Route of the request being served, set by RouteTagMiddleware
+current_route: ContextVar[str] = ContextVar("current_route", default="none")
+
+
+class StageMetrics:
+    """Thread-safe histograms of stage durations and counters of LLM tokens"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DURATION_BUCKETS):
+        self.buckets = buckets
+        self._durations: Dict[Tuple[str, str], list] = {}
+        self._tokens: Dict[Tuple[str, str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float, route: Optional[str] = None) -> None:
+        """Record one stage duration for the current (or given) route"""
+        route = route or current_route.get()
+        with self._lock:
+            # [bucket counts..., sum, count]
+            series = self._durations.setdefault((route, stage), [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series[i] += 1
+            series[-2] += seconds
+            series[-1] += 1
+
+        if METRICS_LOG_STAGES:
+            logger.info("stage", extra={"fields": {"route": route, "stage": stage, "ms": round(seconds * 1000, 2)}})
+
+    def add_tokens(self, model: str, prompt_tokens: int, completion_tokens: int, route: Optional[str] = None) -> None:
+        """Count the tokens used by one LLM call"""
+        route = route or current_route.get()
+        with self._lock:
+            for kind, count in (("prompt", prompt_tokens), ("completion", completion_tokens)):
+                key = (route, model, kind)
+                self._tokens[key] = self._tokens.get(key, 0) + count
+
+        if METRICS_LOG_STAGES:
+            logger.info("tokens", extra={"fields": {
+                "route": route, "model": model,
+                "prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens
+            }})
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            durations = {key: list(series) for key, series in self._durations.items()}
+            tokens = dict(self._tokens)
+
+        lines = [
+            "# HELP bswd_stage_duration_seconds Time spent in each chat/analysis pipeline stage",
+            "# TYPE bswd_stage_duration_seconds histogram",
+        ]
+        for (route, stage), series in sorted(durations.items()):
+            labels = f'route="{_escape(route)}",stage="{_escape(stage)}"'
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'bswd_stage_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'bswd_stage_duration_seconds_bucket{{{labels},le="+Inf"}} {series[-1]}')
+            lines.append(f"bswd_stage_duration_seconds_sum{{{labels}}} {series[-2]}")
+            lines.append(f"bswd_stage_duration_seconds_count{{{labels}}} {series[-1]}")
+
+        lines += [
+            "# HELP bswd_llm_tokens_total LLM tokens used, by route, model and prompt/completion",
+            "# TYPE bswd_llm_tokens_total counter",
+        ]
+        for (route, model, kind), count in sorted(tokens.items()):
+            lines.append(f'bswd_llm_tokens_total{{route="{_escape(route)}",model="{_escape(model)}",type="{kind}"}} {count}')
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._durations.clear()
+            self._tokens.clear()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = StageMetrics()
+
+
+@contextmanager
+def record_stage(stage: str) -> Iterator[None]:
+    """Time a block of code as a pipeline stage of the current route"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.observe(stage, time.perf_counter() - start)
+
+
+class RouteTagMiddleware:
+    """ASGI middleware that tags everything a request does with its route path"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        token = current_route.set(scope["path"])
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_route.reset(token)
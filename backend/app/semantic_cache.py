@@ -0,0 +1,169 @@
+"""
+Semantic Answer Cache
+Reuses chatbot answers for questions that are semantically the same as earlier ones
+"""
+
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, FrozenSet, List, Optional
+
+import numpy as np
+
+from embedding_cache import normalize_text
+from hybrid_retriever import tokenize
+
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "500"))
+ANSWER_CACHE_TTL_SECONDS = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "86400"))
+# Long prompts (e.g. admin prompts with an application embedded) are never cached
+ANSWER_CACHE_MAX_QUESTION_CHARS = int(os.getenv("ANSWER_CACHE_MAX_QUESTION_CHARS", "500"))
+
+
+# Upper-case terms such as "OSAP", "CSG-DSE" or "BSWD"
+ACRONYM_PATTERN = re.compile(r"\b[A-Z][A-Z0-9]+(?:-[A-Z0-9]+)*\b")
+
+
+def key_terms(question: str) -> FrozenSet[str]:
+    """
+    Numbers and acronyms in a question, as hybrid_retriever.tokenize terms.
+
+    Embeddings barely move when only these change ("$2,000" vs "$3,000",
+    "OSAP" vs "BSWD", "section 4.2" vs "section 4.3"), but the answer does.
+    """
+    numbers = [term for term in tokenize(question) if term[0].isdigit()]
+    acronyms = tokenize(" ".join(ACRONYM_PATTERN.findall(question)))
+    return frozenset(numbers + acronyms)
+
+
+class SemanticAnswerCache:
+    """
+    In-process cache of (question embedding -> answer + sources).
+
+    A lookup returns the closest cached answer whose cosine similarity is
+    at least `threshold` and whose question has the same numbers and
+    acronyms as the one asked (see key_terms). Entries expire after `ttl_seconds`, the least
+    recently hit entry is evicted past `max_entries`, and invalidate()
+    drops everything (call it after the index is re-ingested).
+    """
+
+    def __init__(
+        self,
+        embeddings,
+        threshold: float = ANSWER_CACHE_THRESHOLD,
+        max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = ANSWER_CACHE_TTL_SECONDS,
+        max_question_chars: int = ANSWER_CACHE_MAX_QUESTION_CHARS
+    ):
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_question_chars = max_question_chars
+        self.hits = 0
+        self.misses = 0
+        self._entries: List[Dict[str, Any]] = []
+        self._vectors: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    def accepts(self, question: str) -> bool:
+        """Whether a question is short enough to be looked up / stored"""
+        return 0 < len(question.strip()) <= self.max_question_chars
+
+    async def aembed(self, question: str) -> np.ndarray:
+        """
+        Unit-length embedding of the question.
+
+        Embeds the same (whitespace-normalized, case-kept) text the retriever
+        does, so with the shared CachedEmbeddings the retrieval on a miss
+        reuses this vector instead of making a second embedding call.
+        """
+        vector = np.asarray(await self.embeddings.aembed_query(normalize_text(question)), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, vector: np.ndarray, question: str) -> Optional[Dict[str, Any]]:
+        """
+        Find a cached answer for a question embedding.
+
+        Args:
+            vector: Embedding of the question from aembed()
+            question: The question itself, for the key term check
+
+        Returns:
+            dict: {"answer", "source_documents", "similarity"} or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            self._drop_expired(now)
+            if not self._entries:
+                self.misses += 1
+                return None
+
+            similarities = self._vectors @ vector
+            terms = key_terms(question)
+            candidates = np.flatnonzero(similarities >= self.threshold)
+            matching = [i for i in candidates if self._entries[i]["key_terms"] == terms]
+            if not matching:
+                self.misses += 1
+                return None
+            best = max(matching, key=lambda i: similarities[i])
+
+            entry = self._entries[best]
+            entry["last_hit"] = now
+            self.hits += 1
+            return {
+                "answer": entry["answer"],
+                "source_documents": entry["source_documents"],
+                "similarity": float(similarities[best])
+            }
+
+    def store(self, vector: np.ndarray, question: str, answer: str, source_documents: list) -> None:
+        """Cache an answer under a question embedding"""
+        if not answer:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._entries.append({
+                "question": question,
+                "key_terms": key_terms(question),
+                "answer": answer,
+                "source_documents": source_documents,
+                "created": now,
+                "last_hit": now
+            })
+            self._vectors = vector[None, :] if self._vectors is None else np.vstack([self._vectors, vector])
+
+            if len(self._entries) > self.max_entries:
+                lru = min(range(len(self._entries)), key=lambda i: self._entries[i]["last_hit"])
+                self._remove([lru])
+
+    def invalidate(self) -> None:
+        """Drop every cached answer (e.g. after re-ingesting the manual)"""
+        with self._lock:
+            self._entries = []
+            self._vectors = None
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "threshold": self.threshold
+        }
+
+    def _drop_expired(self, now: float) -> None:
+        expired = [i for i, e in enumerate(self._entries) if now - e["created"] >= self.ttl_seconds]
+        if expired:
+            self._remove(expired)
+
+    def _remove(self, indexes: List[int]) -> None:
+        removed = set(indexes)
+        keep = [i for i in range(len(self._entries)) if i not in removed]
+        self._entries = [self._entries[i] for i in keep]
+        self._vectors = self._vectors[keep] if keep else None
@@ -0,0 +1,30 @@
+"""
+Startup Timing
+Records how long cold-start phases take (imports, chain and client initialization)
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+_timings: Dict[str, float] = {}
+
+
+@contextmanager
+def record_timing(phase: str):
+    """Time a block and store its duration (ms) under `phase`"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _timings[phase] = round((time.perf_counter() - start) * 1000, 2)
+
+
+def record_since(phase: str, start: float) -> None:
+    """Store the time elapsed since a perf_counter() reading under `phase`"""
+    _timings[phase] = round((time.perf_counter() - start) * 1000, 2)
+
+
+def timing_report() -> Dict[str, float]:
+    """All recorded phase durations in milliseconds"""
+    return dict(_timings)
@@ -0,0 +1,88 @@
+"""
+Token Counter
+Local token counts for prompt budgeting (tiktoken when its encoding is available, a character estimate otherwise)
+"""
+
+import math
+import os
+import threading
+from typing import Iterable
+
+from app_logging import get_logger
+
+logger = get_logger("tokens")
+
+# tiktoken | estimate
+TOKEN_COUNTER = os.getenv("TOKEN_COUNTER", "tiktoken").lower()
+TOKEN_ENCODING = os.getenv("TOKEN_ENCODING", "cl100k_base")
+# Used when tiktoken (or its encoding file) is unavailable; ~4 chars per token for English
+CHARS_PER_TOKEN = 4.0
+# Per-message overhead of the OpenAI chat format (role, separators)
+TOKENS_PER_MESSAGE = 4
+
+_encoder = None
+_encoder_loaded = False
+_encoder_lock = threading.Lock()
+
+
+def load_encoder():
+    """
+    Load the tiktoken encoding (call at startup, off the event loop).
+
+    tiktoken downloads the encoding file on first use unless it is already
+    in TIKTOKEN_CACHE_DIR (the Docker images ship it there), so this can
+    block on the network. Until it has run, counts use the estimate.
+
+    Returns:
+        The encoding, or None when falling back to the estimate
+    """
+    global _encoder, _encoder_loaded
+
+    with _encoder_lock:
+        if not _encoder_loaded:
+            if TOKEN_COUNTER == "tiktoken":
+                try:
+                    import tiktoken
+                    _encoder = tiktoken.get_encoding(TOKEN_ENCODING)
+                except Exception as e:
+                    logger.warning(f"tiktoken unavailable, estimating tokens from length: {e}")
+            _encoder_loaded = True
+
+    return _encoder
+
+
+def preload_encoder() -> None:
+    """Start load_encoder() in a daemon thread so a slow download can't hold up startup"""
+    if TOKEN_COUNTER == "tiktoken" and not _encoder_loaded:
+        threading.Thread(target=load_encoder, name="tiktoken-load", daemon=True).start()
+
+
+def _get_encoder():
+    """The loaded encoding; never loads it, so requests can't block on a download"""
+    return _encoder
+
+
+def count_tokens(text: str) -> int:
+    """Number of tokens in a piece of text"""
+    if not text:
+        return 0
+    encoder = _get_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def count_message_tokens(messages: Iterable) -> int:
+    """Number of tokens a list of chat messages adds to a prompt"""
+    return sum(TOKENS_PER_MESSAGE + count_tokens(str(message.content)) for message in messages)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text down to at most `max_tokens` tokens"""
+    if max_tokens <= 0:
+        return ""
+    encoder = _get_encoder()
+    if encoder is not None:
+        tokens = encoder.encode(text, disallowed_special=())
+        return text if len(tokens) <= max_tokens else encoder.decode(tokens[:max_tokens])
+    return text[:int(max_tokens * CHARS_PER_TOKEN)]
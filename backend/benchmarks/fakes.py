@@ -0,0 +1,162 @@
+"""
+Local Stand-ins for OpenAI and Pinecone
+Deterministic fake chat model, embeddings and remote vectorstore with configurable latency
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+import numpy as np
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from local_vectorstore import LocalVectorStore
+
+WORDS = (
+    "The BSWD covers disability related equipment and services that a student needs "
+    "to participate in their studies and is assessed against documented functional limitations"
+).split()
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    ChatOpenAI stand-in that answers after a fixed delay at a fixed token rate.
+
+    Sync calls sleep (blocking the calling thread, like a sync HTTP call);
+    async calls await asyncio.sleep. Prompts that ask for "risk_factors"
+    (the analysis prompt) get a JSON answer, everything else gets prose.
+    """
+
+    model_name: str = "fake-chat"
+    first_token_latency: float = 0.3
+    tokens_per_second: float = 50.0
+    response_tokens: int = 40
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _tokens(self, messages: List[BaseMessage]) -> List[str]:
+        prompt = messages[-1].content if messages else ""
+        if "risk_factors" in prompt or any("risk_factors" in m.content for m in messages):
+            answer = json.dumps({"risk_factors": ["Synthetic risk factor"], "reasoning": " ".join(WORDS[:20])})
+            return [answer[i:i + 4] for i in range(0, len(answer), 4)]
+        seed = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest(), 16)
+        return [WORDS[(seed + i) % len(WORDS)] + " " for i in range(self.response_tokens)]
+
+    def _usage(self, messages: List[BaseMessage], tokens: List[str]) -> dict:
+        # Rough word count stands in for the tokenizer
+        prompt_tokens = sum(len(str(m.content).split()) for m in messages)
+        return {"input_tokens": prompt_tokens, "output_tokens": len(tokens), "total_tokens": prompt_tokens + len(tokens)}
+
+    def _token_delay(self) -> float:
+        return 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def _total_delay(self, tokens: List[str]) -> float:
+        return self.first_token_latency + self._token_delay() * max(len(tokens) - 1, 0)
+
+    def _generate(self, messages, stop=None, run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        tokens = self._tokens(messages)
+        time.sleep(self._total_delay(tokens))
+        message = AIMessage(content="".join(tokens), usage_metadata=self._usage(messages, tokens))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages, stop=None, run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        tokens = self._tokens(messages)
+        await asyncio.sleep(self._total_delay(tokens))
+        message = AIMessage(content="".join(tokens), usage_metadata=self._usage(messages, tokens))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages, stop=None, run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.first_token_latency)
+        tokens = self._tokens(messages)
+        for i, token in enumerate(tokens):
+            if i:
+                time.sleep(self._token_delay())
+            usage = self._usage(messages, tokens) if i == len(tokens) - 1 else None
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token, usage_metadata=usage))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages, stop=None, run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.first_token_latency)
+        tokens = self._tokens(messages)
+        for i, token in enumerate(tokens):
+            if i:
+                await asyncio.sleep(self._token_delay())
+            usage = self._usage(messages, tokens) if i == len(tokens) - 1 else None
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token, usage_metadata=usage))
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+
+class FakeEmbeddings(Embeddings):
+    """OpenAIEmbeddings stand-in: hash-seeded unit vectors after a fixed delay"""
+
+    def __init__(self, size: int = 1536, latency: float = 0.05):
+        self.size = size
+        self.latency = latency
+
+    def _vector(self, text: str) -> List[float]:
+        seed = int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:8], 16)
+        vector = np.random.default_rng(seed).standard_normal(self.size)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        time.sleep(self.latency)
+        return self._vector(text)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        await asyncio.sleep(self.latency)
+        return self._vector(text)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        time.sleep(self.latency)
+        return [self._vector(text) for text in texts]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        await asyncio.sleep(self.latency)
+        return [self._vector(text) for text in texts]
+
+
+class FakeRemoteVectorStore(LocalVectorStore):
+    """PineconeVectorStore stand-in: in-process search plus a simulated network round trip"""
+
+    latency: float = 0.03
+
+    def with_embeddings(self, embedding: Embeddings) -> "FakeRemoteVectorStore":
+        """A view of the same data that embeds queries with another Embeddings"""
+        view = FakeRemoteVectorStore(embedding, self._vectors, self._ids, self._texts, self._metadatas)
+        view.latency = self.latency
+        return view
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any):
+        vector = self._embedding.embed_query(query)
+        time.sleep(self.latency)
+        return self.similarity_search_by_vector_with_score(vector, k)
+
+    async def asimilarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any):
+        vector = await self._embedding.aembed_query(query)
+        await asyncio.sleep(self.latency)
+        return self.similarity_search_by_vector_with_score(vector, k)
+
+
+def make_manual_store(embeddings: FakeEmbeddings, chunks: int = 500, latency: float = 0.03) -> FakeRemoteVectorStore:
+    """A vectorstore filled with synthetic manual chunks (built without the embedding delay)"""
+    store = FakeRemoteVectorStore(embeddings)
+    store.latency = latency
+    texts = [
+        f"Section {i // 10}.{i % 10}: " + " ".join(WORDS[(i + j) % len(WORDS)] for j in range(60))
+        for i in range(chunks)
+    ]
+    vectors = [embeddings._vector(text) for text in texts]
+    store.add_embeddings(texts, vectors, [{"source": "synthetic-manual.pdf", "page": i // 4} for i in range(chunks)])
+    return store
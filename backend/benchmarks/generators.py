@@ -0,0 +1,68 @@
+"""
+Synthetic Application Generators
+Deterministic, seeded application payloads for the benchmark suite
+"""
+
+import random
+from typing import Any, Dict, List
+
+DISABILITY_TYPES = ["permanent", "persistent-prolonged", "temporary", "none"]
+STUDY_TYPES = ["full-time", "part-time"]
+OSAP_APPLICATIONS = ["full-time", "part-time", "none"]
+FUNDING_SOURCES = ["bswd", "csg"]
+INSTITUTIONS = ["Seneca Polytechnic", "Humber College", "George Brown College", "Centennial College"]
+
+# Item names seen in real applications: most hit a policy category, some don't
+ITEM_NAMES = [
+    "Laptop", "Dell Laptop 15\"", "MacBook Pro", "Desktop Computer", "iPad Air", "Tablet",
+    "Microsoft Office Software", "Read&Write App Subscription", "Dragon NaturallySpeaking",
+    "Kurzweil 3000", "JAWS Screen Reader", "Ergonomic Chair", "Standing Desk",
+    "Subject Tutoring (20 hrs)", "Tutor - Math", "Note-taker Services", "Scribe",
+    "Noise Cancelling Headphones", "Digital Recorder", "Printer", "Smartpen", "FM System",
+]
+
+
+def make_item(rng: random.Random) -> Dict[str, Any]:
+    return {
+        "item": rng.choice(ITEM_NAMES),
+        "cost": round(rng.uniform(50, 4000), 2),
+        "funding_source": rng.choice(FUNDING_SOURCES)
+    }
+
+
+def make_application(rng: random.Random, index: int, max_items: int = 6) -> Dict[str, Any]:
+    """One raw application payload, shaped like the frontend's POST body"""
+    return {
+        "application_id": f"app-{index:06d}",
+        "student_id": f"{rng.randint(100000000, 999999999)}",
+        "first_name": "Student",
+        "last_name": f"{index}",
+        "disability_type": rng.choices(DISABILITY_TYPES, weights=[5, 3, 1, 1])[0],
+        "study_type": rng.choices(STUDY_TYPES, weights=[4, 1])[0],
+        "osap_application": rng.choices(OSAP_APPLICATIONS, weights=[4, 1, 1])[0],
+        "has_osap_restrictions": rng.random() < 0.1,
+        "federal_need": round(rng.choice([0, rng.uniform(0, 25000)]), 2),
+        "provincial_need": round(rng.uniform(0, 3000), 2),
+        "disability_verification_date": "2024-09-01",
+        "functional_limitations": rng.sample(["mobility", "vision", "hearing", "learning", "attention"], 2),
+        "needs_psycho_ed_assessment": rng.random() < 0.2,
+        "requested_items": [make_item(rng) for _ in range(rng.randint(0, max_items))],
+        "institution": rng.choice(INSTITUTIONS),
+        "program": "Computer Programming"
+    }
+
+
+def make_applications(size: int, seed: int = 42, max_items: int = 6) -> List[Dict[str, Any]]:
+    """
+    Generate a reproducible set of raw application payloads.
+
+    Args:
+        size: Number of applications
+        seed: RNG seed (same seed -> same applications)
+        max_items: Upper bound on requested items per application
+
+    Returns:
+        list: Application dicts ready for ApplicationData.model_validate
+    """
+    rng = random.Random(seed)
+    return [make_application(rng, i, max_items) for i in range(size)]
@@ -0,0 +1,280 @@
+"""
+Load Test Harness
+Drives the FastAPI app at increasing concurrency with local fakes for OpenAI and Pinecone
+
+Usage:
+    python benchmarks/loadtest.py                                   # all scenarios
+    python benchmarks/loadtest.py --scenarios chat chat-stream --concurrency 1 8 32
+    python benchmarks/loadtest.py --llm-latency 0.8 --tokens-per-second 30 --json results.json
+
+The app runs under uvicorn in a background thread (its own event loop) and
+is called over real HTTP, so blocking work inside a request shows up as
+latency and lost throughput rather than stalling the load generator.
+ChatOpenAI, OpenAIEmbeddings and PineconeVectorStore are replaced with the
+deterministic stand-ins in fakes.py; no API keys or network are needed.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(BENCHMARK_DIR)
+sys.path.append(os.path.join(BENCHMARK_DIR, "..", "app"))
+
+QUESTIONS = [
+    "What equipment does the BSWD cover?",
+    "How much funding can a part-time student receive from the BSWD?",
+    "Is tutoring an eligible service under the bursary?",
+    "What documentation is needed to verify a permanent disability?",
+    "Can a student get an ergonomic chair funded?",
+    "What is the annual cap for combined BSWD and CSG-DSE funding?",
+    "Does the bursary cover assistive software subscriptions?",
+    "What about note-taking services?",
+]
+
+SCENARIOS = ["chat", "chat-stream", "admin-chat", "analysis", "analysis-batch"]
+
+
+# SETUP
+
+def configure_environment(args) -> None:
+    """Env vars the app reads at import time (must run before importing it)"""
+    os.environ.setdefault("OPENAI_API_KEY", "sk-loadtest")
+    os.environ.setdefault("PINECONE_API_KEY", "loadtest")
+    os.environ["CHAIN_WARM_START"] = "true"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ["EMBEDDING_CACHE_PERSIST"] = "none"
+    # Offline: don't let tiktoken try to download its encoding
+    os.environ.setdefault("TOKEN_COUNTER", "estimate")
+    os.environ["ANSWER_CACHE_ENABLED"] = "true" if args.answer_cache else "false"
+    os.environ["ANALYSIS_CACHE_BACKEND"] = "memory" if args.analysis_cache else "none"
+
+
+def install_fakes(args) -> None:
+    """Point the app's model and vectorstore factories at the local stand-ins"""
+    import chain
+    import llm_clients
+    from fakes import FakeChatModel, FakeEmbeddings, make_manual_store
+
+    def fake_chat_model(model: str = "", temperature: float = 0.7):
+        return FakeChatModel(
+            first_token_latency=args.llm_latency,
+            tokens_per_second=args.tokens_per_second,
+            response_tokens=args.response_tokens
+        )
+
+    embeddings = FakeEmbeddings(latency=args.embedding_latency)
+    store = make_manual_store(embeddings, latency=args.vector_latency)
+
+    llm_clients.get_chat_model = fake_chat_model
+    llm_clients.get_embedding_model = lambda model="": embeddings
+    chain.get_chat_model = fake_chat_model
+    chain.get_embedding_model = lambda model="": embeddings
+    # Same data, but queries embed through the app's cached embeddings wrapper
+    chain.get_vectorstore = lambda index_name: store.with_embeddings(chain.get_embeddings())
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int):
+    """Run the app under uvicorn in a daemon thread and wait until it accepts requests"""
+    import uvicorn
+    import main
+
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("Server failed to start")
+        time.sleep(0.05)
+    return server, thread
+
+
+# SCENARIOS
+# Each returns (latency_seconds, time_to_first_token_seconds or None)
+
+def application_payload(index: int) -> Dict[str, Any]:
+    import random
+    from generators import make_application
+    return make_application(random.Random(index), index)
+
+
+async def run_chat(client, index: int, session_id: str):
+    start = time.perf_counter()
+    response = await client.post("/api/chat", json={"message": QUESTIONS[index % len(QUESTIONS)], "session_id": session_id})
+    response.raise_for_status()
+    return time.perf_counter() - start, None
+
+
+async def run_chat_stream(client, index: int, session_id: str):
+    start = time.perf_counter()
+    first_token = None
+    payload = {"message": QUESTIONS[index % len(QUESTIONS)], "session_id": session_id}
+    async with client.stream("POST", "/api/chat-stream", json=payload) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_bytes():
+            if chunk and first_token is None:
+                first_token = time.perf_counter() - start
+    return time.perf_counter() - start, first_token
+
+
+async def run_admin_chat(client, index: int, session_id: str):
+    start = time.perf_counter()
+    response = await client.post("/api/admin/chat", json={
+        "message": QUESTIONS[index % len(QUESTIONS)],
+        "session_id": session_id,
+        "application_context": application_payload(index)
+    })
+    response.raise_for_status()
+    return time.perf_counter() - start, None
+
+
+async def run_analysis(client, index: int, session_id: str):
+    start = time.perf_counter()
+    response = await client.post("/api/analysis/application", json=application_payload(index))
+    response.raise_for_status()
+    return time.perf_counter() - start, None
+
+
+def make_batch_runner(batch_size: int):
+    async def run_analysis_batch(client, index: int, session_id: str):
+        applications = [application_payload(index * batch_size + i) for i in range(batch_size)]
+        start = time.perf_counter()
+        response = await client.post("/api/analysis/batch", json={"applications": applications})
+        response.raise_for_status()
+        return time.perf_counter() - start, None
+    return run_analysis_batch
+
+
+# RUNNER
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+async def run_level(base_url: str, runner, concurrency: int, requests: int) -> Dict[str, Any]:
+    """Closed loop: `concurrency` workers send requests back to back until `requests` are done"""
+    import httpx
+
+    latencies, first_tokens, errors = [], [], []
+    counter = iter(range(requests))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        async def worker():
+            session_id = str(uuid.uuid4())
+            for index in counter:
+                try:
+                    latency, first_token = await runner(client, index, session_id)
+                    latencies.append(latency)
+                    if first_token is not None:
+                        first_tokens.append(first_token)
+                except Exception as e:
+                    errors.append(str(e))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    def ms(value):
+        return round(value * 1000, 1) if value is not None else None
+
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": ms(percentile(latencies, 50)),
+        "p95_ms": ms(percentile(latencies, 95)),
+        "p99_ms": ms(percentile(latencies, 99)),
+        "ttft_p50_ms": ms(percentile(first_tokens, 50)),
+        "ttft_p95_ms": ms(percentile(first_tokens, 95)),
+    }
+
+
+def print_table(scenario: str, rows: List[Dict[str, Any]]) -> None:
+    def cell(value):
+        return "-" if value is None else str(value)
+
+    print(f"\n{scenario}")
+    print(f"{'conc':>5} {'reqs':>6} {'err':>4} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'ttft p50':>9} {'ttft p95':>9}")
+    for row in rows:
+        print(
+            f"{row['concurrency']:>5} {row['requests']:>6} {row['errors']:>4} {row['throughput_rps']:>8} "
+            f"{cell(row['p50_ms']):>9} {cell(row['p95_ms']):>9} {cell(row['p99_ms']):>9} "
+            f"{cell(row['ttft_p50_ms']):>9} {cell(row['ttft_p95_ms']):>9}"
+        )
+        if row["first_error"]:
+            print(f"      first error: {row['first_error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the API with local fakes for OpenAI and Pinecone")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 16, 64])
+    parser.add_argument("--requests", type=int, default=0, help="Requests per level (default: 4 x concurrency, min 20)")
+    parser.add_argument("--batch-size", type=int, default=10, help="Applications per analysis-batch request")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="Fake LLM time to first token (s)")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0, help="Fake LLM streaming rate")
+    parser.add_argument("--response-tokens", type=int, default=40, help="Fake LLM answer length")
+    parser.add_argument("--embedding-latency", type=float, default=0.05, help="Fake embedding call latency (s)")
+    parser.add_argument("--vector-latency", type=float, default=0.03, help="Fake vectorstore query latency (s)")
+    parser.add_argument("--answer-cache", action="store_true", help="Keep the semantic answer cache on")
+    parser.add_argument("--analysis-cache", action="store_true", help="Keep the analysis reasoning cache on")
+    parser.add_argument("--json", help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    configure_environment(args)
+    install_fakes(args)
+
+    port = free_port()
+    server, thread = start_server(port)
+    base_url = f"http://127.0.0.1:{port}"
+
+    runners = {
+        "chat": run_chat,
+        "chat-stream": run_chat_stream,
+        "admin-chat": run_admin_chat,
+        "analysis": run_analysis,
+        "analysis-batch": make_batch_runner(args.batch_size),
+    }
+
+    results: Dict[str, List[Dict[str, Any]]] = {}
+    try:
+        for scenario in args.scenarios:
+            rows = []
+            for concurrency in args.concurrency:
+                requests = args.requests or max(20, concurrency * 4)
+                rows.append(asyncio.run(run_level(base_url, runners[scenario], concurrency, requests)))
+            results[scenario] = rows
+            print_table(scenario, rows)
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
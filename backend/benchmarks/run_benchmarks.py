@@ -0,0 +1,228 @@
+"""
+Deterministic Scoring Benchmarks
+Offline micro-benchmarks for the per-application scoring and analysis hot paths
+
+Usage:
+    python benchmarks/run_benchmarks.py                   # run and compare with baselines
+    python benchmarks/run_benchmarks.py --check           # exit 1 on a regression (CI)
+    python benchmarks/run_benchmarks.py --update-baseline # record new baselines
+
+Every benchmark runs over the same seeded synthetic application set and
+reports microseconds per application. Pydantic validation is timed on its
+own, and the analysis functions are timed on already-validated models, so a
+regression can be pinned on the model layer or on the policy logic. No
+network access or API keys are needed.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(BENCHMARK_DIR)
+sys.path.append(os.path.join(BENCHMARK_DIR, "..", "app"))
+
+from generators import make_applications
+from analysis_routes import (
+    ApplicationData,
+    ApplicationStatus,
+    analyze_equipment_costs,
+    analyze_financial_need,
+    generate_fallback_reasoning,
+)
+from deterministic_checks import calculate_confidence_score, run_deterministic_checks
+
+BASELINES_PATH = os.path.join(BENCHMARK_DIR, "baselines.json")
+DEFAULT_THRESHOLD = 1.5  # fail when slower than baseline x threshold
+
+
+# BENCHMARKS
+# Each setup takes (raw payloads, validated models) and returns a callable
+# that processes the whole set once; only the callable is timed.
+
+def bench_validation(raw: List[dict], apps: List[ApplicationData]) -> Callable[[], Any]:
+    validate = ApplicationData.model_validate
+    return lambda: [validate(payload) for payload in raw]
+
+
+def bench_deterministic_checks(raw, apps):
+    return lambda: [
+        run_deterministic_checks(a.disability_type, a.study_type, a.has_osap_restrictions)
+        for a in apps
+    ]
+
+
+def bench_confidence_score(raw, apps):
+    inputs = [
+        (
+            a.disability_type in ["permanent", "persistent-prolonged"],
+            a.study_type == "full-time",
+            a.has_osap_restrictions,
+            a.osap_application,
+            a.provincial_need,
+            a.federal_need,
+            a.provincial_need + a.federal_need,
+            sum(item.get("cost", 0) for item in a.requested_items)
+        )
+        for a in apps
+    ]
+    return lambda: [calculate_confidence_score(*args) for args in inputs]
+
+
+def bench_financial_need(raw, apps):
+    return lambda: [analyze_financial_need(a) for a in apps]
+
+
+def bench_equipment_costs(raw, apps):
+    return lambda: [analyze_equipment_costs(a) for a in apps]
+
+
+def bench_fallback_reasoning(raw, apps):
+    inputs = []
+    for a in apps:
+        total_funding = a.provincial_need + a.federal_need
+        equipment_cost = sum(item.get("cost", 0) for item in a.requested_items)
+        ratio = total_funding / equipment_cost if equipment_cost > 0 else 0
+        inputs.append((85.0, ApplicationStatus.NEEDS_MANUAL_REVIEW, a, total_funding, equipment_cost, ratio))
+    return lambda: [generate_fallback_reasoning(*args) for args in inputs]
+
+
+def bench_deterministic_pipeline(raw, apps):
+    """Everything an application save runs before the LLM, starting from the raw payload"""
+    def run():
+        for payload in raw:
+            a = ApplicationData.model_validate(payload)
+            checks = run_deterministic_checks(a.disability_type, a.study_type, a.has_osap_restrictions)
+            financial = analyze_financial_need(a)
+            analyze_equipment_costs(a)
+            total_funding = a.provincial_need + a.federal_need
+            equipment_cost = financial.total_requested
+            score = calculate_confidence_score(
+                checks.has_disability, checks.is_full_time, checks.has_osap_restrictions,
+                a.osap_application, a.provincial_need, a.federal_need, total_funding, equipment_cost
+            )
+            ratio = total_funding / equipment_cost if equipment_cost > 0 else 0
+            generate_fallback_reasoning(score, ApplicationStatus.NEEDS_MANUAL_REVIEW, a, total_funding, equipment_cost, ratio)
+    return run
+
+
+BENCHMARKS = {
+    "pydantic_validation": bench_validation,
+    "run_deterministic_checks": bench_deterministic_checks,
+    "calculate_confidence_score": bench_confidence_score,
+    "analyze_financial_need": bench_financial_need,
+    "analyze_equipment_costs": bench_equipment_costs,
+    "generate_fallback_reasoning": bench_fallback_reasoning,
+    "deterministic_pipeline": bench_deterministic_pipeline,
+}
+
+
+# RUNNER
+
+def time_benchmark(fn: Callable[[], Any], size: int, repeat: int) -> Dict[str, float]:
+    """Median and best microseconds per application over `repeat` runs (after one warm-up)"""
+    fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        fn()
+        samples.append((time.perf_counter_ns() - start) / 1000 / size)
+    return {"median_us": statistics.median(samples), "best_us": min(samples)}
+
+
+def run_benchmarks(size: int, repeat: int, seed: int, max_items: int, only: List[str] = None) -> Dict[str, Dict[str, float]]:
+    raw = make_applications(size, seed=seed, max_items=max_items)
+    apps = [ApplicationData.model_validate(payload) for payload in raw]
+
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if only and name not in only:
+            continue
+        results[name] = time_benchmark(setup(raw, apps), size, repeat)
+    return results
+
+
+def load_baselines() -> Dict[str, Any]:
+    if not os.path.exists(BASELINES_PATH):
+        return {"benchmarks": {}}
+    with open(BASELINES_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baselines(results: Dict[str, Dict[str, float]], args, previous: Dict[str, Any]) -> None:
+    # Benchmarks not run this time (--only) keep their old baselines
+    benchmarks = dict(previous.get("benchmarks", {}))
+    for name, result in results.items():
+        entry = {"median_us": round(result["median_us"], 3)}
+        # Keep hand-tuned per-benchmark thresholds
+        if "threshold" in previous.get("benchmarks", {}).get(name, {}):
+            entry["threshold"] = previous["benchmarks"][name]["threshold"]
+        benchmarks[name] = entry
+
+    with open(BASELINES_PATH, "w", encoding="utf-8") as f:
+        json.dump({
+            "size": args.size,
+            "seed": args.seed,
+            "max_items": args.max_items,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "default_threshold": previous.get("default_threshold", DEFAULT_THRESHOLD),
+            "benchmarks": benchmarks
+        }, f, indent=2)
+        f.write("\n")
+
+
+def compare(results: Dict[str, Dict[str, float]], baselines: Dict[str, Any]) -> List[str]:
+    """Print a results table and return the names of regressed benchmarks"""
+    default_threshold = baselines.get("default_threshold", DEFAULT_THRESHOLD)
+    regressions = []
+
+    print(f"{'benchmark':<30} {'median us/app':>14} {'best':>10} {'baseline':>10} {'ratio':>7}")
+    for name, result in results.items():
+        baseline = baselines["benchmarks"].get(name)
+        if baseline is None:
+            print(f"{name:<30} {result['median_us']:>14.3f} {result['best_us']:>10.3f} {'-':>10} {'-':>7}")
+            continue
+
+        ratio = result["median_us"] / baseline["median_us"]
+        threshold = baseline.get("threshold", default_threshold)
+        flag = ""
+        if ratio > threshold:
+            regressions.append(name)
+            flag = f"  REGRESSION (> {threshold:.2f}x)"
+        print(f"{name:<30} {result['median_us']:>14.3f} {result['best_us']:>10.3f} {baseline['median_us']:>10.3f} {ratio:>6.2f}x{flag}")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the deterministic scoring and analysis functions")
+    parser.add_argument("--size", type=int, default=2000, help="Synthetic applications per run")
+    parser.add_argument("--max-items", type=int, default=6, help="Max requested items per application")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=7, help="Timed runs per benchmark")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="Run a subset of benchmarks")
+    parser.add_argument("--check", action="store_true", help="Exit non-zero if any benchmark regressed")
+    parser.add_argument("--update-baseline", action="store_true", help="Write these results to baselines.json")
+    args = parser.parse_args()
+
+    baselines = load_baselines()
+    results = run_benchmarks(args.size, args.repeat, args.seed, args.max_items, args.only)
+    regressions = compare(results, baselines)
+
+    if args.update_baseline:
+        save_baselines(results, args, baselines)
+        print(f"Baselines written to {BASELINES_PATH}")
+    elif regressions:
+        print(f"{len(regressions)} benchmark(s) regressed: {', '.join(regressions)}")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
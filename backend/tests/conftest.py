@@ -0,0 +1,14 @@
+"""
+Test setup: the app modules import each other as top-level modules (as main.py
+arranges), so put backend/app and the benchmark generators on the path.
+"""
+
+import os
+import sys
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(TESTS_DIR, "..", "app"))
+sys.path.append(os.path.join(TESTS_DIR, "..", "benchmarks"))
+
+# Keep token counting local and offline
+os.environ.setdefault("TOKEN_COUNTER", "estimate")
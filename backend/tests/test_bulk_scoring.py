@@ -0,0 +1,108 @@
+"""Bulk (NumPy) confidence scores must equal the scalar score for every application"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from bulk_scoring import calculate_confidence_scores, equipment_cost, score_requests
+from deterministic_checks import calculate_confidence_score, run_deterministic_checks
+from generators import make_applications
+
+
+def scalar_score(app) -> float:
+    """Score one application the way POST /api/analysis/score does"""
+    checks = run_deterministic_checks(app["disability_type"], app["study_type"], app["has_osap_restrictions"])
+    return calculate_confidence_score(
+        checks.has_disability,
+        checks.is_full_time,
+        checks.has_osap_restrictions,
+        app["osap_application"],
+        app["provincial_need"],
+        app["federal_need"],
+        app["provincial_need"] + app["federal_need"],
+        sum(item.get("cost", 0) for item in app["requested_items"])
+    )
+
+
+def bulk_scores(apps) -> list:
+    return calculate_confidence_scores(
+        [app["disability_type"] for app in apps],
+        [app["study_type"] for app in apps],
+        [app["has_osap_restrictions"] for app in apps],
+        [app["osap_application"] for app in apps],
+        [app["provincial_need"] for app in apps],
+        [app["federal_need"] for app in apps],
+        [equipment_cost(app["requested_items"]) for app in apps]
+    ).tolist()
+
+
+def application(**overrides):
+    app = {
+        "disability_type": "permanent",
+        "study_type": "full-time",
+        "has_osap_restrictions": False,
+        "osap_application": "full-time",
+        "provincial_need": 1000.0,
+        "federal_need": 0.0,
+        "requested_items": [{"item": "Laptop", "cost": 1000.0}],
+    }
+    app.update(overrides)
+    return app
+
+
+def items(*costs):
+    return [{"item": "Item", "cost": cost} for cost in costs]
+
+
+EDGE_CASES = {
+    "zero cost item": application(requested_items=items(0)),
+    "zero cost items and zero need": application(provincial_need=0.0, requested_items=items(0, 0.0)),
+    "item without a cost": application(requested_items=[{"item": "Scribe"}]),
+    "empty equipment": application(requested_items=[]),
+    "empty equipment and zero need": application(provincial_need=0.0, requested_items=[]),
+    "missing OSAP": application(osap_application="none", federal_need=500.0),
+    "blank OSAP": application(osap_application="", federal_need=500.0),
+    "upper-case OSAP": application(osap_application="Full-Time", federal_need=500.0),
+    "part-time OSAP": application(osap_application="part-time", federal_need=500.0),
+    "missing OSAP without federal need": application(osap_application="none"),
+    "federal need over cap": application(federal_need=20000.01, requested_items=items(30000)),
+    "federal need at cap": application(federal_need=20000.0, requested_items=items(30000)),
+    "provincial need at cap": application(provincial_need=2000.0, requested_items=items(2000)),
+    "provincial need over cap": application(provincial_need=2000.01, requested_items=items(2000)),
+    "ratio 0.5": application(requested_items=items(2000)),
+    "ratio just over 0.5": application(provincial_need=1001.0, requested_items=items(2000)),
+    "ratio 1.0": application(),
+    "ratio 1.1": application(provincial_need=1100.0),
+    "ratio 1.2": application(provincial_need=1200.0),
+    "ratio 2.0": application(provincial_need=2000.0),
+    "ratio 4.0": application(provincial_need=1000.0, federal_need=3000.0),
+    "fractional costs": application(provincial_need=1234.56, requested_items=items(0.1, 0.2, 1000.3)),
+    "every penalty": application(
+        disability_type="none", study_type="part-time", has_osap_restrictions=True,
+        osap_application="none", provincial_need=3000.0, federal_need=25000.0, requested_items=[]
+    ),
+}
+
+
+@pytest.mark.parametrize("seed", [1, 42, 2024])
+def test_bulk_scores_match_scalar_scores_on_generated_applications(seed):
+    apps = make_applications(500, seed=seed)
+    assert bulk_scores(apps) == [scalar_score(app) for app in apps]
+
+
+@pytest.mark.parametrize("name", list(EDGE_CASES))
+def test_bulk_scores_match_scalar_scores_on_edge_cases(name):
+    app = EDGE_CASES[name]
+    assert bulk_scores([app]) == [scalar_score(app)]
+
+
+def test_edge_cases_scored_together_match_one_by_one():
+    apps = list(EDGE_CASES.values())
+    assert bulk_scores(apps) == [scalar_score(app) for app in apps]
+
+
+def test_score_requests_keeps_order():
+    apps = make_applications(50, seed=7)
+    requests = [SimpleNamespace(**app) for app in apps]
+    assert score_requests(requests) == [scalar_score(app) for app in apps]
+    assert score_requests([]) == []
@@ -0,0 +1,84 @@
+"""Cache backends: abstract base, SQLite LRU eviction and the async wrappers"""
+
+import asyncio
+import time
+
+import pytest
+
+from cache_backends import CacheBackend, MemoryCacheBackend, SqliteCacheBackend
+
+
+def test_incomplete_backend_fails_when_created():
+    class NoLen(CacheBackend):
+        def _get(self, key):
+            return None
+
+        def _set(self, key, value):
+            pass
+
+        def _clear(self):
+            pass
+
+    with pytest.raises(TypeError):
+        NoLen()
+
+
+def test_sqlite_evicts_least_recently_used_only_past_the_cap(tmp_path):
+    cache = SqliteCacheBackend(str(tmp_path / "cache.sqlite3"), max_entries=3, access_flush_entries=100)
+    for key in "abc":
+        cache.set(key, key)
+        time.sleep(0.01)
+    assert len(cache) == 3
+
+    # The hit on "a" is buffered, and written before the eviction runs
+    assert cache.get("a") == "a"
+    cache.set("d", "d")
+
+    assert len(cache) == 3
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in "acd"] == ["a", "c", "d"]
+
+
+def test_sqlite_replacing_a_key_keeps_every_entry(tmp_path):
+    cache = SqliteCacheBackend(str(tmp_path / "cache.sqlite3"), max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("b", 3)
+    cache.set("b", 4)
+    assert len(cache) == 2
+    assert cache.get("a") == 1 and cache.get("b") == 4
+
+
+def test_sqlite_survives_reopening(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    SqliteCacheBackend(path).set("key", {"vector": [0.5, 1.5]})
+    assert SqliteCacheBackend(path).get("key") == {"vector": [0.5, 1.5]}
+
+
+def test_sqlite_expired_entries_miss(tmp_path):
+    cache = SqliteCacheBackend(str(tmp_path / "cache.sqlite3"), ttl_seconds=0.01)
+    cache.set("key", 1)
+    time.sleep(0.02)
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+@pytest.mark.parametrize("make_cache", [
+    lambda path: MemoryCacheBackend(max_entries=10),
+    lambda path: SqliteCacheBackend(str(path / "cache.sqlite3"), max_entries=10),
+])
+def test_async_methods_match_sync_ones(tmp_path, make_cache):
+    cache = make_cache(tmp_path)
+
+    async def run():
+        await cache.aset("key", [1, 2])
+        hit = await cache.aget("key")
+        miss = await cache.aget("other")
+        stats = await cache.astats()
+        await cache.aclear()
+        return hit, miss, stats, await cache.astats()
+
+    hit, miss, stats, cleared = asyncio.run(run())
+    assert hit == [1, 2] and miss is None
+    assert (stats["entries"], stats["hits"], stats["misses"]) == (1, 1, 1)
+    assert cleared["entries"] == 0
@@ -0,0 +1,92 @@
+"""Semantic answer cache: near-duplicate questions that need a different answer must miss"""
+
+import asyncio
+
+import pytest
+
+from semantic_cache import SemanticAnswerCache, key_terms
+
+
+class SameVectorEmbeddings:
+    """Every question embeds to the same vector, so only the key-term check can tell them apart"""
+
+    async def aembed_query(self, text):
+        return [1.0, 0.0, 0.0]
+
+
+def cached(question: str) -> SemanticAnswerCache:
+    cache = SemanticAnswerCache(SameVectorEmbeddings(), threshold=0.95)
+    vector = asyncio.run(cache.aembed(question))
+    cache.store(vector, question, f"answer to: {question}", [])
+    return cache
+
+
+def lookup(cache: SemanticAnswerCache, question: str):
+    return cache.lookup(asyncio.run(cache.aembed(question)), question)
+
+
+@pytest.mark.parametrize("cached_question, question", [
+    ("Is a $2,000 laptop covered by BSWD?", "Is a $3,000 laptop covered by BSWD?"),
+    ("Is a $2,000 laptop covered by BSWD?", "Is a $2,500 laptop covered by BSWD?"),
+    ("What is the maximum CSG-DSE amount?", "What is the maximum BSWD amount?"),
+    ("Do I need OSAP to apply?", "Do I need BSWD to apply?"),
+    ("What does section 4.2 cover?", "What does section 4.3 cover?"),
+    ("How many hours of tutoring are covered?", "How many hours of tutoring are covered under OSAP?"),
+])
+def test_near_duplicates_with_different_numbers_or_acronyms_miss(cached_question, question):
+    cache = cached(cached_question)
+    assert lookup(cache, question) is None
+    assert cache.stats()["misses"] == 1
+
+
+@pytest.mark.parametrize("cached_question, question", [
+    ("Is a $2,000 laptop covered by BSWD?", "is a 2000 dollar laptop covered by BSWD"),
+    ("What is the maximum CSG-DSE amount?", "What's the max CSG-DSE amount?"),
+    ("Is a laptop covered?", "Is a laptop covered"),
+])
+def test_rephrased_questions_with_the_same_key_terms_hit(cached_question, question):
+    cache = cached(cached_question)
+    hit = lookup(cache, question)
+    assert hit is not None
+    assert hit["answer"] == f"answer to: {cached_question}"
+
+
+def test_lookup_picks_the_entry_whose_key_terms_match():
+    cache = cached("Is a $2,000 laptop covered by BSWD?")
+    vector = asyncio.run(cache.aembed("Is a $3,000 laptop covered by BSWD?"))
+    cache.store(vector, "Is a $3,000 laptop covered by BSWD?", "the $3,000 answer", [])
+
+    assert lookup(cache, "Is a $3,000 laptop covered by BSWD?")["answer"] == "the $3,000 answer"
+
+
+def test_key_terms_are_numbers_and_acronyms():
+    assert key_terms("Is a $2,000 CSG-DSE item covered in section 4.2?") == {"2000", "csg-dse", "csg", "dse", "4.2"}
+    assert key_terms("is a laptop covered?") == frozenset()
+
+
+class CountingEmbeddings:
+    def __init__(self):
+        self.calls = []
+
+    def embed_query(self, text):
+        self.calls.append(text)
+        return [1.0, float(len(text)), 0.0]
+
+    async def aembed_query(self, text):
+        return self.embed_query(text)
+
+
+def test_cache_probe_and_retrieval_share_one_embedding_call():
+    from embedding_cache import CachedEmbeddings
+
+    underlying = CountingEmbeddings()
+    embeddings = CachedEmbeddings(underlying, model_name="test")
+    cache = SemanticAnswerCache(embeddings)
+
+    question = "What is  the BSWD?"
+    cache.lookup(asyncio.run(cache.aembed(question)), question)
+    # The retriever embeds the question as asked (sync and async vectorstores)
+    asyncio.run(embeddings.aembed_query(question))
+    embeddings.embed_query(question)
+
+    assert underlying.calls == ["What is the BSWD?"]
@@ -6,6 +6,7 @@
 import { useState, useRef, useEffect } from "react";
 import ReactMarkdown from "react-markdown";
 import { useDraggable } from "@/hooks/useDraggable";
+import { ApplicationAnalysis } from "@/lib/admin/types";
 
 interface Message {
   role: "user" | "assistant";
@@ -46,6 +47,8 @@ interface ApplicationData {
 
 interface Props {
   applicationData: ApplicationData;
+  // Full analysis result (checks, financials, equipment review) for the backend context
+  analysis?: ApplicationAnalysis | null;
   apiBaseUrl?: string;
   mode: "embedded" | "floating";
   isOpen: boolean;
@@ -54,6 +57,7 @@ interface Props {
 
 export function ApplicationChatbot({
   applicationData,
+  analysis = null,
   apiBaseUrl = process.env.NEXT_PUBLIC_API_URL,
   mode = "embedded",
   isOpen = true,
@@ -69,6 +73,8 @@ export function ApplicationChatbot({
 
   const [input, setInput] = useState("");
   const [loading, setLoading] = useState(false);
+  // Keeps this chat's history separate from other sessions on the backend
+  const [sessionId] = useState(() => crypto.randomUUID());
 
   const messagesEndRef = useRef<HTMLDivElement>(null);
   const inputRef = useRef<HTMLInputElement>(null);
@@ -106,25 +112,6 @@ export function ApplicationChatbot({
 
   if (isFloating && !isOpen) return null;
 
-  const buildPrompt = (input: string) => {
-    let prompt = `
-    You are a BSWD/CSG-DSE application assessment assistant...
-    (omitted here to shorten—FULL logic unchanged in your real file)
-    ${JSON.stringify(applicationData, null, 2)}
-    `;
-    const a = applicationData.analysis;
-    prompt += `
-    AI ANALYSIS RESULTS:
-    Decision: ${a.decision}
-    Confidence: ${a.confidence}%
-    Reasoning: ${a.reasoning}
-    Risk Factors: ${a.risk_factors.map((r: string) => `- ${r}`).join("\n")}
-    Total Funding: $${a.recommended_funding}
-    `;
-
-    return `${prompt}\n${input}`;
-  };
-
   /** Send Message */
   const handleSend = async () => {
     if (!input.trim() || loading) return;
@@ -139,46 +126,73 @@ export function ApplicationChatbot({
     setLoading(true);
 
     try {
-      const response = await fetch(`${apiBaseUrl}/api/chat-stream`, {
+      // The backend builds the application/analysis context for this turn;
+      // only the question itself goes into the conversation history
+      const { analysis: summary, ...application } = applicationData;
+      const response = await fetch(`${apiBaseUrl}/api/admin/chat-stream`, {
         method: "POST",
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify({
-          message: buildPrompt(input),
+          message: input,
+          session_id: sessionId,
           history: messages.map((m) => ({ role: m.role, content: m.content })),
+          application_context: application,
+          analysis_context: analysis ?? {
+            ai_analysis: {
+              recommended_status: summary.decision,
+              confidence_score: summary.confidence / 100,
+              reasoning: summary.reasoning,
+              risk_factors: summary.risk_factors,
+              funding_recommendation: summary.recommended_funding,
+            },
+          },
+          stream_format: "sse",
         }),
       });
+      if (!response.ok || !response.body) {
+        throw new Error(`Admin chat failed: ${response.status}`);
+      }
 
-      // Initiate tools to read streaming data from backend
-      const reader = response.body?.getReader();
+      // Server-sent events: "token" frames carry {token}, "done" ends the answer
+      const reader = response.body.getReader();
       const decoder = new TextDecoder();
-
-      const assistantMessage: Message = {
-        role: "assistant",
-        content: "",
-        timestamp: new Date(),
+      let buffer = "";
+      let isFirstToken = true;
+      const appendToken = (token: string) => {
+        // The loading icon is replaced by the answer as soon as it starts
+        if (isFirstToken) {
+          setMessages((prev) => [
+            ...prev,
+            { role: "assistant", content: "", timestamp: new Date() },
+          ]);
+          setLoading(false);
+          isFirstToken = false;
+        }
+        setMessages((prev) =>
+          prev.map((message, idx) =>
+            idx === prev.length - 1
+              ? { ...message, content: message.content + token }
+              : message,
+          ),
+        );
       };
-      let isFirstLoop = true;
+
       while (true) {
-        const { value, done } = await reader!.read();
+        const { value, done } = await reader.read();
         if (done) break;
-        const chunk = decoder.decode(value);
+        buffer += decoder.decode(value, { stream: true });
 
-        // Initally, chatbot reponse will have a loading icon
-        // When it reaches here
-        // The icon dissapears and replaced with a streamreponse
-        if (isFirstLoop) {
-          setMessages((prev) => [...prev, assistantMessage]);
-          setLoading(false);
-          isFirstLoop = false;
+        let boundary = buffer.indexOf("\n\n");
+        while (boundary !== -1) {
+          const frame = buffer.slice(0, boundary);
+          buffer = buffer.slice(boundary + 2);
+          boundary = buffer.indexOf("\n\n");
+
+          const lines = frame.split("\n");
+          const event = lines.find((l) => l.startsWith("event: "))?.slice(7);
+          const data = lines.find((l) => l.startsWith("data: "))?.slice(6);
+          if (event === "token" && data) appendToken(JSON.parse(data).token);
         }
-        setMessages((prev) =>
-          prev.map((message, idx) => {
-            if (idx === prev.length - 1) {
-              return { ...message, content: message.content + chunk };
-            }
-            return message;
-          }),
-        );
       }
     } catch {
       setMessages((prev) => [
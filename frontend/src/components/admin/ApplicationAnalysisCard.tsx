@@ -30,6 +30,9 @@ interface AIAnalysisResult {
   risk_factors: string[];
   requires_human_review: boolean;
   reasoning: string;
+  reasoning_source?: "llm" | "deterministic";
+  // Set while the LLM reasoning is still being written in the background
+  enrichment_id?: string | null;
 }
 
 interface ApplicationAnalysis {
@@ -186,6 +189,11 @@ export function ApplicationAnalysisCard({ analysis, loading }: Props) {
         <div id="admin-ai-analysis-reasoning" className="p-4 bg-gray-50 rounded-lg">
           <p className="font-semibold mb-2">AI Reasoning</p>
           <p className="text-sm">{analysis.ai_analysis.reasoning}</p>
+          {analysis.ai_analysis.enrichment_id && (
+            <p className="text-xs text-gray-500 mt-2 animate-pulse">
+              Refining reasoning with AI...
+            </p>
+          )}
         </div>
       </div>
     </div>
@@ -25,6 +25,8 @@ export function ChatbotWidget() {
   const [messages, setMessages] = useState<Message[]>([]);
   const [isLoading, setIsLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
+  // Keeps this widget's history separate from other users on the backend
+  const [sessionId] = useState(() => crypto.randomUUID());
   const messagesEndRef = useRef<HTMLDivElement>(null);
   const { elementRef, onMouseDown } = useDraggable();
 
@@ -75,6 +77,7 @@ export function ChatbotWidget() {
           },
           body: JSON.stringify({
             message: userMessage,
+            session_id: sessionId,
             history: messages.map((msg) => ({
               role: msg.role,
               content: msg.content,
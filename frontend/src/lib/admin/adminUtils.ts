@@ -5,6 +5,10 @@
 
 import { Attachment } from "@/lib/adminStore";
 import { downloadAttachmentFromStorage } from "@/lib/adminStore";
+import {
+  ANALYSIS_REASONING_MODE,
+  AnalysisReasoningMode,
+} from "@/lib/admin/constants";
 
 export const titleCase = (s: string | undefined) => {
   if (!s) return "—";
@@ -102,4 +106,24 @@ export const normalizeFunctionalLimitations = (raw: unknown): string[] => {
   }
 
   return [];
-};
\ No newline at end of file
+};
+
+let reasoningModePromise: Promise<AnalysisReasoningMode> | null = null;
+
+// Configured reasoning mode, downgraded to "default" unless the backend can
+// serve background jobs (e.g. not on Lambda or behind several workers)
+export const getAnalysisReasoningMode = (): Promise<AnalysisReasoningMode> => {
+  if (ANALYSIS_REASONING_MODE !== "background") return Promise.resolve("default");
+  if (!reasoningModePromise) {
+    reasoningModePromise = fetch(`${process.env.NEXT_PUBLIC_API_URL}/health`)
+      .then((response) => (response.ok ? response.json() : null))
+      .then((health) =>
+        health?.capabilities?.background_reasoning ? "background" : "default"
+      )
+      .catch(() => {
+        reasoningModePromise = null;
+        return "default" as const;
+      });
+  }
+  return reasoningModePromise;
+};
@@ -22,4 +22,14 @@ export const SORT_MENU: { label: string; value: SortKey }[] = [
   { label: "Confidence Score", value: "Score" },
   { label: "Application Status", value: "Status" },
   { label: "Alphabetical (Name)", value: "Name" },
-];
\ No newline at end of file
+];
+
+// How AI reasoning is fetched for an analysis:
+//   "default"    - no preference; the backend's ANALYSIS_REASONING_MODE applies
+//   "background" - show the deterministic analysis first and poll for the reasoning;
+//                  only used when the backend's /health reports it can run it
+export type AnalysisReasoningMode = "default" | "background";
+export const ANALYSIS_REASONING_MODE: AnalysisReasoningMode =
+  process.env.NEXT_PUBLIC_ANALYSIS_REASONING_MODE === "background"
+    ? "background"
+    : "default";
@@ -36,6 +36,9 @@ export interface AIAnalysisResult {
   risk_factors: string[];
   requires_human_review: boolean;
   reasoning: string;
+  reasoning_source?: "llm" | "deterministic";
+  // Set while the LLM reasoning is still being written in the background
+  enrichment_id?: string | null;
 }
 
 export interface ApplicationAnalysis {
@@ -45,6 +45,7 @@ import {
   toChips,
   formatMoney,
   normalizeFunctionalLimitations,
+  getAnalysisReasoningMode,
 } from "@/lib/admin/adminUtils";
 
 import {
@@ -85,6 +86,8 @@ function AdminApplicationDetailPage() {
   // Analysis
   const [analysis, setAnalysis] = useState<ApplicationAnalysis | null>(null);
   const [analyzing, setAnalyzing] = useState(false);
+  // Background reasoning job being polled; results of older jobs are ignored
+  const enrichmentRef = useRef<string | null>(null);
 
   // Chatbot
   const [isChatOpen, setIsChatOpen] = useState(false);
@@ -105,6 +108,78 @@ function AdminApplicationDetailPage() {
     });
   };
 
+  // Stop applying background reasoning once the page is gone
+  useEffect(() => {
+    return () => {
+      enrichmentRef.current = null;
+    };
+  }, []);
+
+  // Long-poll the backend for the LLM reasoning of a deterministic-first analysis
+  const pollReasoning = async (enrichmentId: string) => {
+    enrichmentRef.current = enrichmentId;
+    let result: {
+      status: string;
+      reasoning?: string;
+      risk_factors?: string[];
+    } | null = null;
+
+    try {
+      for (
+        let attempt = 0;
+        attempt < 6 && enrichmentRef.current === enrichmentId;
+        attempt++
+      ) {
+        const response = await fetch(
+          `${
+            process.env.NEXT_PUBLIC_API_URL
+          }/api/analysis/reasoning/${enrichmentId}?wait=20`
+        );
+        if (!response.ok) break;
+        result = await response.json();
+        if (result?.status !== "pending") break;
+      }
+    } catch (error) {
+      console.error("Reasoning enrichment failed:", error);
+    }
+
+    if (enrichmentRef.current !== enrichmentId) return;
+    enrichmentRef.current = null;
+
+    // Anything but "complete" keeps the deterministic reasoning
+    const enriched = result?.status === "complete" ? result : null;
+    setAnalysis((prev) => {
+      if (!prev || prev.ai_analysis.enrichment_id !== enrichmentId) return prev;
+      return {
+        ...prev,
+        ai_analysis: {
+          ...prev.ai_analysis,
+          enrichment_id: null,
+          ...(enriched && {
+            reasoning: enriched.reasoning ?? prev.ai_analysis.reasoning,
+            risk_factors: enriched.risk_factors ?? prev.ai_analysis.risk_factors,
+            reasoning_source: "llm" as const,
+          }),
+        },
+      };
+    });
+    if (enriched) {
+      setActiveChatApplication((prev) =>
+        prev
+          ? {
+              ...prev,
+              analysis: {
+                ...prev.analysis,
+                reasoning: enriched.reasoning ?? prev.analysis.reasoning,
+                risk_factors:
+                  enriched.risk_factors ?? prev.analysis.risk_factors,
+              },
+            }
+          : prev
+      );
+    }
+  };
+
   const analyzeApplication = async () => {
     if (!editForm || !summary) return;
     setAnalyzing(true);
@@ -136,10 +211,15 @@ function AdminApplicationDetailPage() {
         program: editForm.program,
       };
 
+      // Only ask for background reasoning; otherwise the backend's own
+      // ANALYSIS_REASONING_MODE (e.g. deterministic-only) applies
+      const reasoningMode = await getAnalysisReasoningMode();
+      const reasoningQuery =
+        reasoningMode === "background" ? "?reasoning=background" : "";
       const response = await fetch(
         `${
           process.env.NEXT_PUBLIC_API_URL
-        }/api/analysis/application`,
+        }/api/analysis/application${reasoningQuery}`,
         {
           method: "POST",
           headers: { "Content-Type": "application/json" },
@@ -190,6 +270,13 @@ function AdminApplicationDetailPage() {
           },
         };
         setActiveChatApplication(appDataWithAnalysis);
+
+        // Scores and checks are shown right away; the AI reasoning follows
+        if (analysisResult.ai_analysis.enrichment_id) {
+          pollReasoning(analysisResult.ai_analysis.enrichment_id);
+        } else {
+          enrichmentRef.current = null;
+        }
       }
     } catch (error) {
       console.error("Analysis failed:", error);
@@ -768,6 +855,7 @@ function AdminApplicationDetailPage() {
             isOpen={isChatOpen}
             onClose={() => setIsChatOpen(false)}
             applicationData={activeChatApplication}
+            analysis={analysis}
           />
         </>
       )}